@@ -0,0 +1,24 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# (connect, read) timeout for requests made on these sessions
+DEFAULT_TIMEOUT = (3.05, 15)
+
+# Transient statuses worth retrying: rate limiting and upstream server errors
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+def create_session(pool_connections: int = 10, pool_maxsize: int = 20) -> requests.Session:
+    """
+    Create a requests session that keeps HTTPS connections alive and pooled,
+    so repeated calls to NCBI/NLM endpoints skip the TCP and TLS handshake.
+    Connection errors and transient error statuses are retried with backoff.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=RETRY_STATUSES)
+    )
+    session.mount("https://", adapter)
+    return session
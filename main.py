@@ -1,33 +1,96 @@
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
-from pubmed_search import process_query, PubMedSearchError
-from medlineplus_search import MedlinePlusAPI, MedlinePlusError
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import State
+from pydantic import BaseModel, ConfigDict, Field
+from pubmed_search import (
+    aclose_clients,
+    aprocess_query,
+    create_http_client,
+    PubMedSearchError
+)
+from medlineplus_search import MedlinePlusAPI
 from soap_processor import SOAPProcessor, SOAPNote
+from http_session import create_session
+from openai import AsyncOpenAI
+import httpx
 import uvicorn
-from typing import Optional, List, Dict, Any
+import asyncio
+from typing import Optional, List, Dict, Any, Tuple, AsyncIterator, Union
 import logging
-import openai
-from openai import AsyncOpenAI
-import PyPDF2
-import io
-import json
+from pypdf import PdfReader
+import orjson
 import os
+import hashlib
+import time
+from itertools import islice
+from cachetools import TTLCache
+from contextlib import asynccontextmanager
+from collections import defaultdict
+from types import MappingProxyType
 
-# Configure logging
+# Configure logging once for the whole application
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    force=True
 )
 logger = logging.getLogger(__name__)
 
-# Initialize OpenAI client
-client = AsyncOpenAI()
+GPT_MODEL = "gpt-4-0125-preview"  # Using GPT-4 Turbo which supports JSON response format
+
+# Parsed GPT analyses keyed by a hash of model, temperature, prompt and content
+gpt_cache = TTLCache(maxsize=1024, ttl=24 * 60 * 60)
+gpt_inflight: Dict[str, asyncio.Future] = {}
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build one set of pooled clients per worker and share them across requests
+    app.state.openai = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    app.state.http = create_http_client()
+    app.state.medlineplus = MedlinePlusAPI(tool_name="pubmed_api_client", session=create_session())
+    try:
+        yield
+    finally:
+        # Release pooled connections held by the shared clients
+        await app.state.http.aclose()
+        await app.state.openai.close()
+        app.state.medlineplus.session.close()
+        # And any module-level defaults a helper fell back to
+        await aclose_clients()
+
+def get_openai(request: Request) -> AsyncOpenAI:
+    """
+    Return the application's shared OpenAI client.
+    """
+    return request.app.state.openai
+
+def get_http_client(request: Request) -> httpx.AsyncClient:
+    """
+    Return the application's shared E-utilities HTTP client.
+    """
+    return request.app.state.http
+
+def get_medlineplus(request: Request) -> MedlinePlusAPI:
+    """
+    Return the application's shared MedlinePlus client.
+    """
+    return request.app.state.medlineplus
+
+class OrjsonResponse(JSONResponse):
+    """
+    JSON response serialized with orjson, in place of FastAPI's deprecated ORJSONResponse.
+    """
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
 
 app = FastAPI(
     title="Clinical Evidence Search API",
     description="API for searching medical literature and analyzing clinical notes",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=OrjsonResponse,
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -39,11 +102,49 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize APIs and processors
-medlineplus_api = MedlinePlusAPI(tool_name="pubmed_api_client")
+# Initialize processors
 soap_processor = SOAPProcessor()
 
+# Admission limits for uploaded SOAP note PDFs
+PDF_CONTENT_TYPES = ("application/pdf",)
+MAX_PDF_BYTES = 10 * 1024 * 1024
+MAX_PDF_PAGES = 30
+
+# Bound concurrent literature searches per worker, GPT calls included.
+# NCBI's request rate is enforced separately, around each E-utilities call in pubmed_search.
+search_semaphore = asyncio.Semaphore(8)
+
+# Evidence buckets returned by each SOAP endpoint
+SOAP_EVIDENCE_BUCKETS = ('clinical_guidelines', 'treatment', 'age_specific', 'medication')
+ANALYSIS_EVIDENCE_BUCKETS = ('clinical_guidelines', 'treatment', 'diagnosis', 'medication')
+DEFAULT_EVIDENCE_BUCKET = 'clinical_guidelines'
+
+# Alternative spellings of query focus values and the bucket they belong to
+FOCUS_ALIASES = {
+    'guidelines': 'clinical_guidelines',
+    'guideline': 'clinical_guidelines',
+    'diagnostic': 'diagnosis',
+    'medications': 'medication',
+    'age-specific': 'age_specific'
+}
+
+def build_focus_map(buckets: Tuple[str, ...]) -> MappingProxyType:
+    """
+    Build a read-only mapping from lowercase query focus to evidence bucket.
+    """
+    focus_map = {bucket: bucket for bucket in buckets}
+    focus_map.update((alias, bucket) for alias, bucket in FOCUS_ALIASES.items() if bucket in buckets)
+    return MappingProxyType(focus_map)
+
+SOAP_FOCUS_MAP = build_focus_map(SOAP_EVIDENCE_BUCKETS)
+ANALYSIS_FOCUS_MAP = build_focus_map(ANALYSIS_EVIDENCE_BUCKETS)
+
+# Request bodies reject unknown fields and trim surrounding whitespace from strings
+REQUEST_MODEL_CONFIG = ConfigDict(extra='forbid', str_strip_whitespace=True)
+
 class Query(BaseModel):
+    model_config = REQUEST_MODEL_CONFIG
+
     text: str
     max_results: int = Field(default=5, ge=1, le=100)
     year_filter: Optional[str] = Field(
@@ -68,6 +169,8 @@ class ErrorResponse(BaseModel):
     details: Optional[str] = None
 
 class SOAPRequest(BaseModel):
+    model_config = REQUEST_MODEL_CONFIG
+
     soap_note: str
     include_medlineplus: bool = Field(
         default=True,
@@ -79,15 +182,57 @@ class SOAPRequest(BaseModel):
     )
 
 class AnalysisRequest(BaseModel):
-    pubmed_results: Optional[Dict[str, Any]]
-    medlineplus_results: Optional[Dict[str, Any]]
+    model_config = REQUEST_MODEL_CONFIG
+
+    pubmed_results: Optional[Dict[str, Any]] = None
+    medlineplus_results: Optional[Dict[str, Any]] = None
     search_query: str
 
 class SOAPAnalysisRequest(BaseModel):
+    model_config = REQUEST_MODEL_CONFIG
+
     content: str
     type: str = "text"
 
-async def analyze_with_gpt(content: str, system_prompt: str) -> Dict[str, Any]:
+def gpt_message_content(content: Union[str, Dict[str, Any]]) -> str:
+    """
+    Encode structured content once with orjson for use as a chat message.
+    """
+    if isinstance(content, str):
+        return content
+    return orjson.dumps(content).decode()
+
+async def analyze_with_gpt(
+    oai: AsyncOpenAI,
+    content: Union[str, Dict[str, Any]],
+    system_prompt: str,
+    temperature: float = 0.7
+) -> Dict[str, Any]:
+    content = gpt_message_content(content)
+    cache_key = hashlib.blake2b(
+        f"{GPT_MODEL}\0{temperature}\0{system_prompt}\0{content}".encode(),
+        digest_size=16
+    ).hexdigest()
+    cached = gpt_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    # Concurrent identical requests share a single completion
+    task = gpt_inflight.get(cache_key)
+    if task is None:
+        task = asyncio.ensure_future(request_gpt_analysis(oai, content, system_prompt, temperature, cache_key))
+        gpt_inflight[cache_key] = task
+        task.add_done_callback(lambda _: gpt_inflight.pop(cache_key, None))
+    # Shield so one cancelled caller doesn't cancel the request for the others
+    return await asyncio.shield(task)
+
+async def request_gpt_analysis(
+    oai: AsyncOpenAI,
+    content: str,
+    system_prompt: str,
+    temperature: float,
+    cache_key: str
+) -> Dict[str, Any]:
     try:
         # Update system prompt to explicitly request JSON
         json_system_prompt = f"""
@@ -100,21 +245,23 @@ IMPORTANT: Your response MUST be a valid JSON object.
 - Validate the JSON structure before responding
 """
         
-        response = await client.chat.completions.create(
-            model="gpt-4-0125-preview",  # Using GPT-4 Turbo which supports JSON response format
+        response = await oai.chat.completions.create(
+            model=GPT_MODEL,
             messages=[
                 {"role": "system", "content": json_system_prompt},
                 {"role": "user", "content": content}
             ],
-            temperature=0.7,
+            temperature=temperature,
             response_format={"type": "json_object"}
         )
         
         try:
-            return json.loads(response.choices[0].message.content)
-        except json.JSONDecodeError as json_err:
-            logger.error(f"JSON parsing error: {str(json_err)}")
-            logger.error(f"Raw response content: {response.choices[0].message.content}")
+            result = orjson.loads(response.choices[0].message.content)
+            gpt_cache[cache_key] = result
+            return result
+        except orjson.JSONDecodeError as json_err:
+            logger.error("JSON parsing error: %s", json_err)
+            logger.error("Raw response content: %s", response.choices[0].message.content)
             raise HTTPException(
                 status_code=500,
                 detail={
@@ -123,14 +270,199 @@ IMPORTANT: Your response MUST be a valid JSON object.
                 }
             )
     except Exception as e:
-        logger.error(f"Error in GPT analysis: {str(e)}")
+        logger.error("Error in GPT analysis: %s", e)
         raise HTTPException(
             status_code=500,
             detail={"error": "Failed to analyze content with GPT", "details": str(e)}
         )
 
+def analyze_note(text: str) -> Tuple[SOAPNote, List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Parse a SOAP note and derive its search queries and recommendations.
+    """
+    soap_note = soap_processor.parse_soap_note(text)
+    queries = soap_processor.generate_search_queries(soap_note)
+    recommendations = soap_processor.generate_recommendations(soap_note)
+    return soap_note, queries, recommendations
+
+def extract_pdf_text(pdf_file, max_pages: int = MAX_PDF_PAGES) -> str:
+    """
+    Extract the text of the first max_pages pages of a PDF file object.
+    """
+    start = time.perf_counter()
+    reader = PdfReader(pdf_file)
+    text = "".join(page.extract_text() or "" for page in islice(reader.pages, max_pages))
+    logger.info(
+        "Extracted %d chars from %d of %d PDF pages in %.3fs",
+        len(text), min(len(reader.pages), max_pages), len(reader.pages), time.perf_counter() - start
+    )
+    return text
+
+async def analyze_sections(
+    oai: AsyncOpenAI,
+    content: Union[str, Dict[str, Any]],
+    system_prompts: Tuple[str, ...],
+    temperature: float = 0.7
+) -> Dict[str, Any]:
+    """
+    Run independent section prompts over the same content concurrently
+    and merge their JSON objects into one.
+    """
+    # Encode structured content once rather than once per prompt
+    content = gpt_message_content(content)
+    sections = await asyncio.gather(
+        *(analyze_with_gpt(oai, content, prompt, temperature=temperature) for prompt in system_prompts)
+    )
+    merged = {}
+    for section in sections:
+        merged.update(section)
+    return merged
+
+async def search_medlineplus(
+    medlineplus: MedlinePlusAPI,
+    text: str,
+    max_results: int = 3,
+    language: str = "en"
+) -> Dict[str, Any]:
+    """
+    Search MedlinePlus off the event loop, returning an error payload on failure.
+    MedlinePlus is a best-effort source, so any error is logged rather than raised.
+    """
+    try:
+        return await run_in_threadpool(
+            medlineplus.search_health_topics,
+            query=text,
+            language=language,
+            max_results=max_results
+        )
+    except Exception as e:
+        logger.error("MedlinePlus search error: %s", e)
+        return {"error": str(e), "topics": []}
+
+def usable_search_queries(
+    entries: Any,
+    priorities: Optional[Tuple[str, ...]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Keep the search query entries that carry query text, logging and skipping malformed ones.
+    If priorities are given, only entries with one of those priorities are kept.
+    """
+    if not isinstance(entries, list):
+        if entries is not None:
+            logger.warning("Ignoring search queries that are not a list: %r", entries)
+        return []
+    
+    queries = []
+    for entry in entries:
+        if not isinstance(entry, dict) or not isinstance(entry.get('text'), str) or not entry['text'].strip():
+            logger.warning("Skipping malformed search query: %r", entry)
+            continue
+        if priorities is not None:
+            priority = entry.get('priority')
+            if not isinstance(priority, str):
+                logger.warning("Skipping search query without a priority: %r", entry)
+                continue
+            if priority.lower() not in priorities:
+                continue
+        queries.append(entry)
+    return queries
+
+async def search_literature(
+    app_state: State,
+    text: str,
+    max_results: int,
+    include_medlineplus: bool = True
+) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+    """
+    Search PubMed and, if requested, MedlinePlus concurrently for a single query,
+    using the clients held on the application state.
+    """
+    async with search_semaphore:
+        pubmed_request = aprocess_query(
+            user_input=text,
+            max_results=max_results,
+            http=app_state.http,
+            oai=app_state.openai
+        )
+        if not include_medlineplus:
+            return await pubmed_request, None
+        return await asyncio.gather(
+            pubmed_request,
+            search_medlineplus(app_state.medlineplus, text)
+        )
+
+async def collect_soap_evidence(
+    app_state: State,
+    queries: List[Dict[str, Any]],
+    max_results: int,
+    include_medlineplus: bool
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Search literature for every generated SOAP query and group the results by evidence bucket.
+    """
+    evidence = defaultdict(list)
+    queries = usable_search_queries(queries)
+    
+    results = await asyncio.gather(
+        *(search_literature(
+            app_state,
+            query['text'],
+            max_results=max_results,
+            include_medlineplus=include_medlineplus
+        ) for query in queries),
+        return_exceptions=True
+    )
+    
+    for query, result in zip(queries, results):
+        bucket = SOAP_FOCUS_MAP.get(str(query.get('focus', '')).lower(), DEFAULT_EVIDENCE_BUCKET)
+        if isinstance(result, Exception):
+            logger.error("Error processing query '%s': %s", query['text'], result)
+            evidence[bucket].append({
+                'query': query['text'],
+                'error': str(result)
+            })
+            continue
+        
+        # Add results to evidence
+        pubmed_results, medlineplus_results = result
+        evidence[bucket].append({
+            'query': query['text'],
+            'pubmed_results': pubmed_results,
+            'medlineplus_results': medlineplus_results
+        })
+    
+    return evidence
+
+async def stream_evidence_response(
+    head: Dict[str, Any],
+    evidence_task: asyncio.Task,
+    buckets: Tuple[str, ...]
+) -> AsyncIterator[bytes]:
+    """
+    Stream a JSON object made of ``head`` plus an ``evidence`` member.
+    The head is sent immediately; evidence entries are encoded one at a time
+    once the searches finish, so the full payload is never buffered at once.
+    """
+    try:
+        yield orjson.dumps(head)[:-1] + b',"evidence":{'
+        evidence = await evidence_task
+        for bucket_idx, bucket in enumerate(buckets):
+            yield (b',' if bucket_idx else b'') + orjson.dumps(bucket) + b':['
+            for entry_idx, entry in enumerate(evidence.get(bucket, [])):
+                yield (b',' if entry_idx else b'') + orjson.dumps(entry)
+            yield b']'
+        yield b'}}'
+    finally:
+        # Stop outstanding searches if the client goes away mid-stream
+        evidence_task.cancel()
+
 @app.post("/search")
-async def search(query: Query):
+async def search(
+    query: Query,
+    oai: AsyncOpenAI = Depends(get_openai),
+    http: httpx.AsyncClient = Depends(get_http_client),
+    medlineplus: MedlinePlusAPI = Depends(get_medlineplus)
+):
     """
     Search PubMed using a natural language query and optionally include MedlinePlus health topics.
     
@@ -147,52 +479,32 @@ async def search(query: Query):
     - language: Language for MedlinePlus results ('en' or 'es')
     """
     try:
-        logger.info(f"Received search request: {query.dict()}")
-        
-        # Process the query with increased max_results if filtering is requested
-        max_results = query.max_results * 3 if query.article_types else query.max_results
+        logger.info(
+            "Received search request: text_len=%d max_results=%d year_filter=%s article_types=%s medlineplus=%s",
+            len(query.text), query.max_results, query.year_filter, query.article_types, query.include_medlineplus
+        )
         
-        # Process the PubMed query
-        pubmed_results = process_query(
+        # Process the PubMed query; article types are filtered by PubMed itself.
+        # MedlinePlus results, if requested, are fetched at the same time.
+        pubmed_request = aprocess_query(
             user_input=query.text,
-            max_results=max_results,
-            year_filter=query.year_filter
+            max_results=query.max_results,
+            year_filter=query.year_filter,
+            article_types=query.article_types,
+            http=http,
+            oai=oai
         )
-        
-        # Filter by article type if specified
-        if query.article_types:
-            logger.info(f"Filtering results by article types: {query.article_types}")
-            filtered_articles = []
-            
-            for article in pubmed_results["articles"]:
-                if any(art_type.lower() in [pt.lower() for pt in article["publication_types"]] 
-                      for art_type in query.article_types):
-                    filtered_articles.append(article)
-            
-            if filtered_articles:
-                pubmed_results["articles"] = filtered_articles[:query.max_results]
-            else:
-                pubmed_results["articles"] = []
-                pubmed_results["summary"] = f"No articles of type {', '.join(query.article_types)} were found. Try broadening your search criteria or removing some filters."
-
-        # Get MedlinePlus results if requested
         medlineplus_results = None
         if query.include_medlineplus:
-            try:
-                medlineplus_results = medlineplus_api.search_health_topics(
-                    query=query.text,
-                    language=query.language,
-                    max_results=5,  # Limit to top 5 most relevant health topics
-                    ret_type="all"
-                )
-                logger.info(f"Found {len(medlineplus_results['topics'])} MedlinePlus topics")
-            except MedlinePlusError as e:
-                logger.error(f"MedlinePlus search error: {str(e)}")
-                medlineplus_results = {
-                    "error": str(e),
-                    "topics": []
-                }
-
+            pubmed_results, medlineplus_results = await asyncio.gather(
+                pubmed_request,
+                # Limit to top 5 most relevant health topics
+                search_medlineplus(medlineplus, query.text, max_results=5, language=query.language)
+            )
+            logger.info("Found %d MedlinePlus topics", len(medlineplus_results['topics']))
+        else:
+            pubmed_results = await pubmed_request
+        
         # Combine results
         combined_results = {
             "pubmed_results": pubmed_results,
@@ -202,14 +514,14 @@ async def search(query: Query):
         return combined_results
 
     except PubMedSearchError as e:
-        logger.error(f"PubMed search error: {str(e)}")
+        logger.error("PubMed search error: %s", e)
         raise HTTPException(status_code=500, detail={"error": "PubMed search failed", "details": str(e)})
     except Exception as e:
-        logger.error(f"Unexpected error: {str(e)}")
+        logger.error("Unexpected error: %s", e)
         raise HTTPException(status_code=500, detail={"error": "Internal server error", "details": str(e)})
 
 @app.post("/process_soap")
-async def process_soap(request: SOAPRequest):
+async def process_soap(request: SOAPRequest, http_request: Request):
     """
     Process a SOAP note and return relevant medical literature and recommendations.
     
@@ -221,57 +533,16 @@ async def process_soap(request: SOAPRequest):
     5. Return structured results with evidence-based suggestions
     """
     try:
-        # Parse SOAP note
-        soap_note = soap_processor.parse_soap_note(request.soap_note)
-        
-        # Generate search queries
-        queries = soap_processor.generate_search_queries(soap_note)
-        
-        # Generate initial recommendations
-        recommendations = soap_processor.generate_recommendations(soap_note)
-        
-        # Search literature for each query
-        evidence = {
-            'clinical_guidelines': [],
-            'treatment': [],
-            'age_specific': [],
-            'medication': []
-        }
+        # Parse the note, generate search queries and initial recommendations off the event loop
+        soap_note, queries, recommendations = await run_in_threadpool(analyze_note, request.soap_note)
         
-        for query in queries:
-            try:
-                # Search PubMed
-                pubmed_results = process_query(
-                    user_input=query['text'],
-                    max_results=request.max_results_per_query
-                )
-                
-                # Search MedlinePlus if requested
-                medlineplus_results = None
-                if request.include_medlineplus:
-                    try:
-                        medlineplus_results = medlineplus_api.search_health_topics(
-                            query=query['text'],
-                            language="en",
-                            max_results=3
-                        )
-                    except MedlinePlusError as e:
-                        logger.error(f"MedlinePlus search error: {str(e)}")
-                        medlineplus_results = {"error": str(e), "topics": []}
-                
-                # Add results to evidence
-                evidence[query['focus']].append({
-                    'query': query['text'],
-                    'pubmed_results': pubmed_results,
-                    'medlineplus_results': medlineplus_results
-                })
-                
-            except Exception as e:
-                logger.error(f"Error processing query '{query['text']}': {str(e)}")
-                evidence[query['focus']].append({
-                    'query': query['text'],
-                    'error': str(e)
-                })
+        # Start the literature searches right away; they finish while the response streams
+        evidence_task = asyncio.create_task(collect_soap_evidence(
+            http_request.app.state,
+            queries,
+            max_results=request.max_results_per_query,
+            include_medlineplus=request.include_medlineplus
+        ))
         
         # Prepare response
         response = {
@@ -292,14 +563,16 @@ async def process_soap(request: SOAPRequest):
                     'oxygen_saturation': soap_note.vital_signs.oxygen_saturation
                 }
             },
-            'recommendations': recommendations,
-            'evidence': evidence
+            'recommendations': recommendations
         }
         
-        return response
+        return StreamingResponse(
+            stream_evidence_response(response, evidence_task, SOAP_EVIDENCE_BUCKETS),
+            media_type="application/json"
+        )
         
     except Exception as e:
-        logger.error(f"Error processing SOAP note: {str(e)}")
+        logger.error("Error processing SOAP note: %s", e)
         raise HTTPException(
             status_code=500,
             detail={
@@ -309,7 +582,10 @@ async def process_soap(request: SOAPRequest):
         )
 
 @app.post("/analyze/results")
-async def analyze_search_results(request: AnalysisRequest):
+async def analyze_search_results(
+    request: AnalysisRequest,
+    oai: AsyncOpenAI = Depends(get_openai)
+):
     """
     Analyze search results using GPT to provide a comprehensive summary with citations.
     """
@@ -331,12 +607,14 @@ async def analyze_search_results(request: AnalysisRequest):
         "medlineplus_results": request.medlineplus_results
     }
     
-    return await analyze_with_gpt(json.dumps(content), system_prompt)
+    return await analyze_with_gpt(oai, content, system_prompt)
 
 @app.post("/analyze/soap")
 async def analyze_soap_note(
+    request: Request,
     content: str = Form(None),
-    file: UploadFile = File(None)
+    file: UploadFile = File(None),
+    oai: AsyncOpenAI = Depends(get_openai)
 ):
     """
     Analyze a SOAP note from text or PDF and extract structured information.
@@ -345,12 +623,22 @@ async def analyze_soap_note(
         # First get the content from either file or text input
         note_content = ""
         if file:
+            # Reject uploads we won't parse before doing any work on them
+            if file.content_type not in PDF_CONTENT_TYPES:
+                raise HTTPException(
+                    status_code=415,
+                    detail={"error": "Only PDF files are supported"}
+                )
+            if file.size is None or file.size >= MAX_PDF_BYTES:
+                raise HTTPException(
+                    status_code=413,
+                    detail={"error": f"PDF files must be smaller than {MAX_PDF_BYTES // (1024 * 1024)} MB"}
+                )
             try:
-                pdf_reader = PyPDF2.PdfReader(io.BytesIO(await file.read()))
-                for page in pdf_reader.pages:
-                    note_content += page.extract_text()
+                # Parse straight from the spooled upload, off the event loop
+                note_content = await run_in_threadpool(extract_pdf_text, file.file)
             except Exception as e:
-                logger.error(f"Error processing PDF: {str(e)}")
+                logger.error("Error processing PDF: %s", e)
                 raise HTTPException(
                     status_code=400,
                     detail={"error": "Failed to process PDF file"}
@@ -363,23 +651,35 @@ async def analyze_soap_note(
                 detail={"error": "Either file or content must be provided"}
             )
 
-        # Step 1: Extract structured information from the SOAP note
-        extraction_prompt = """
+        # Step 1: Extract structured information from the SOAP note, one group of sections per prompt
+        extraction_prompts = (
+            """
         Extract structured information from the provided SOAP note. Include:
         1. Patient Demographics (name, age, gender)
         2. Vital Signs (BP, HR, RR, Temp, O2 Sat)
-        3. Chief Complaints
-        4. Key Symptoms
-        5. Relevant Medical History
-        6. Current Medications
-        7. Physical Exam Findings
-        8. Assessment/Diagnoses
-        9. Treatment Plan
+
+        Return as a JSON object with these sections. For each finding, include a confidence level (high/medium/low).
+        """,
+            """
+        Extract structured information from the provided SOAP note. Include:
+        1. Chief Complaints
+        2. Key Symptoms
+        3. Relevant Medical History
+        4. Current Medications
+        5. Physical Exam Findings
+
+        Return as a JSON object with these sections. For each finding, include a confidence level (high/medium/low).
+        """,
+            """
+        Extract structured information from the provided SOAP note. Include:
+        1. Assessment/Diagnoses
+        2. Treatment Plan
 
         Return as a JSON object with these sections. For each finding or diagnosis, include a confidence level (high/medium/low).
         """
+        )
         
-        structured_data = await analyze_with_gpt(note_content, extraction_prompt)
+        structured_data = await analyze_sections(oai, note_content, extraction_prompts, temperature=0)
         
         # Step 2: Generate targeted search queries based on the extracted information
         search_prompt = """
@@ -392,75 +692,72 @@ async def analyze_soap_note(
         Return as a JSON object with an array of search queries, each containing focus, text, and priority fields.
         """
         
-        search_queries = await analyze_with_gpt(json.dumps(structured_data), search_prompt)
+        search_queries = await analyze_with_gpt(oai, structured_data, search_prompt, temperature=0)
         
         # Step 3: Execute the searches
-        evidence = {
-            'clinical_guidelines': [],
-            'treatment': [],
-            'diagnosis': [],
-            'medication': []
-        }
+        evidence = defaultdict(list)
         
-        for query in search_queries.get('queries', []):
-            try:
-                # Only process high and medium priority queries
-                if query['priority'].lower() not in ['high', 'medium']:
-                    continue
-                    
-                # Search PubMed
-                pubmed_results = process_query(
-                    user_input=query['text'],
-                    max_results=5
-                )
-                
-                # Search MedlinePlus for relevant topics
-                medlineplus_results = None
-                try:
-                    medlineplus_results = medlineplus_api.search_health_topics(
-                        query=query['text'],
-                        language="en",
-                        max_results=3
-                    )
-                except Exception as e:
-                    logger.error(f"MedlinePlus search error: {str(e)}")
-                    medlineplus_results = {"error": str(e), "topics": []}
-                
-                # Add results to evidence
-                focus = query['focus'].lower()
-                if focus not in evidence:
-                    focus = 'clinical_guidelines'  # default category
-                    
-                evidence[focus].append({
-                    'query': query['text'],
-                    'priority': query['priority'],
-                    'pubmed_results': pubmed_results,
-                    'medlineplus_results': medlineplus_results
-                })
-                
-            except Exception as e:
-                logger.error(f"Error processing query '{query['text']}': {str(e)}")
+        # Only process high and medium priority queries
+        queries = usable_search_queries(
+            search_queries.get('queries') if isinstance(search_queries, dict) else None,
+            priorities=('high', 'medium')
+        )
+        results = await asyncio.gather(
+            *(search_literature(request.app.state, query['text'], max_results=5) for query in queries),
+            return_exceptions=True
+        )
+        
+        for query, result in zip(queries, results):
+            if isinstance(result, Exception):
+                logger.error("Error processing query '%s': %s", query['text'], result)
                 continue
+            
+            # Add results to evidence
+            pubmed_results, medlineplus_results = result
+            bucket = ANALYSIS_FOCUS_MAP.get(str(query.get('focus', '')).lower(), DEFAULT_EVIDENCE_BUCKET)
+            evidence[bucket].append({
+                'query': query['text'],
+                'priority': query['priority'],
+                'pubmed_results': pubmed_results,
+                'medlineplus_results': medlineplus_results
+            })
+        
+        evidence = {bucket: evidence.get(bucket, []) for bucket in ANALYSIS_EVIDENCE_BUCKETS}
         
-        # Step 4: Generate final analysis and recommendations
-        analysis_prompt = """
+        # Step 4: Generate final analysis and recommendations, one group of sections per prompt
+        analysis_prompts = (
+            """
         Based on the structured patient information and search results, provide:
         1. Clinical Summary
-        2. Evidence-Based Recommendations
-        3. Treatment Considerations
-        4. Follow-up Plans
-        5. Patient Education Points
+
+        Include citation references for each statement.
+        Return as a JSON object with this section.
+        """,
+            """
+        Based on the structured patient information and search results, provide:
+        1. Evidence-Based Recommendations
+        2. Treatment Considerations
+
+        Include citation references for each recommendation.
+        Return as a JSON object with these sections.
+        """,
+            """
+        Based on the structured patient information and search results, provide:
+        1. Follow-up Plans
+        2. Patient Education Points
 
         Include citation references for each recommendation.
         Return as a JSON object with these sections.
         """
+        )
         
-        final_analysis = await analyze_with_gpt(
-            json.dumps({
+        final_analysis = await analyze_sections(
+            oai,
+            {
                 "patient_data": structured_data,
                 "evidence": evidence
-            }),
-            analysis_prompt
+            },
+            analysis_prompts
         )
         
         # Combine everything into the final response
@@ -470,8 +767,10 @@ async def analyze_soap_note(
             "analysis": final_analysis
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error analyzing SOAP note: {str(e)}")
+        logger.error("Error analyzing SOAP note: %s", e)
         raise HTTPException(
             status_code=500,
             detail={"error": "Failed to analyze SOAP note", "details": str(e)}
@@ -533,4 +832,13 @@ async def root():
     }
 
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True) 
\ No newline at end of file
+    # Multiple workers by default; set DEV=1 for a single auto-reloading worker.
+    # With uvicorn[standard] installed the server runs on uvloop and httptools.
+    dev_mode = os.getenv("DEV", "0") == "1"
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=int(os.getenv("PORT", "8000")),
+        workers=1 if dev_mode else int(os.getenv("WEB_CONCURRENCY", "4")),
+        reload=dev_mode
+    ) 
\ No newline at end of file
@@ -1,43 +1,45 @@
 import requests
+import urllib3
 import logging
 import time
-from typing import Dict, Any, Optional
-from xml.etree import ElementTree as ET
+from typing import Dict, Any, Optional, Tuple
+from lxml import etree as ET
 from urllib.parse import quote_plus
 import threading
-from datetime import datetime, timedelta
+import hashlib
+from collections import deque
+from http_session import create_session, DEFAULT_TIMEOUT
+from cachetools import TTLCache, LRUCache
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
 class RateLimiter:
     """Rate limiter to ensure we don't exceed 85 requests per minute"""
     def __init__(self, requests_per_minute: int = 85):
         self.requests_per_minute = requests_per_minute
-        self.requests = []
+        self.window = 60.0
+        # Monotonic timestamps of recent requests, oldest first
+        self.requests = deque()
         self.lock = threading.Lock()
 
     def wait_if_needed(self):
-        now = datetime.now()
-        minute_ago = now - timedelta(minutes=1)
+        now = time.monotonic()
+        cutoff = now - self.window
         
         with self.lock:
-            # Remove requests older than 1 minute
-            self.requests = [req_time for req_time in self.requests if req_time > minute_ago]
+            # Drop requests older than the window
+            while self.requests and self.requests[0] <= cutoff:
+                self.requests.popleft()
             
-            # If we've hit the limit, wait until we can make another request
+            # If we've hit the limit, wait until the oldest request leaves the window
             if len(self.requests) >= self.requests_per_minute:
-                sleep_time = (self.requests[0] - minute_ago).total_seconds()
+                sleep_time = self.requests[0] + self.window - now
                 if sleep_time > 0:
                     time.sleep(sleep_time)
-                self.requests = self.requests[1:]
+                self.requests.popleft()
             
             # Add current request
-            self.requests.append(now)
+            self.requests.append(time.monotonic())
 
 class MedlinePlusError(Exception):
     """Custom exception for MedlinePlus API errors"""
@@ -46,24 +48,38 @@ class MedlinePlusError(Exception):
 class MedlinePlusAPI:
     BASE_URL = "https://wsearch.nlm.nih.gov/ws/query"
     
-    def __init__(self, tool_name: str = "pubmed_api_client", email: Optional[str] = None):
+    def __init__(
+        self,
+        tool_name: str = "pubmed_api_client",
+        email: Optional[str] = None,
+        session: Optional[requests.Session] = None,
+        max_concurrent_requests: int = 5
+    ):
         self.tool_name = tool_name
         self.email = email
+        self.session = session or create_session()
         self.rate_limiter = RateLimiter()
-        self.cache = {}
-        self.cache_duration = timedelta(hours=12)  # Cache results for 12 hours
+        # Cap simultaneous outbound requests on top of the per-minute rate
+        self._concurrency = threading.BoundedSemaphore(max_concurrent_requests)
+        # Bounded LRU cache; results expire after 12 hours
+        self.cache = TTLCache(maxsize=1024, ttl=12 * 60 * 60)
+        # ETag and result of past responses, kept past expiry for revalidation
+        self.validators = LRUCache(maxsize=1024)
+        self._cache_lock = threading.Lock()
 
     def _get_from_cache(self, cache_key: str) -> Optional[Dict[str, Any]]:
-        if cache_key in self.cache:
-            result, timestamp = self.cache[cache_key]
-            if datetime.now() - timestamp < self.cache_duration:
-                return result
-            else:
-                del self.cache[cache_key]
-        return None
+        with self._cache_lock:
+            return self.cache.get(cache_key)
+
+    def _add_to_cache(self, cache_key: str, result: Dict[str, Any], etag: Optional[str] = None):
+        with self._cache_lock:
+            self.cache[cache_key] = result
+            if etag:
+                self.validators[cache_key] = (etag, result)
 
-    def _add_to_cache(self, cache_key: str, result: Dict[str, Any]):
-        self.cache[cache_key] = (result, datetime.now())
+    def _get_validator(self, cache_key: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        with self._cache_lock:
+            return self.validators.get(cache_key)
 
     def search_health_topics(
         self,
@@ -85,7 +101,12 @@ class MedlinePlusAPI:
             Dictionary containing search results and metadata
         """
         # Check cache first
-        cache_key = f"{query}:{language}:{max_results}:{ret_type}"
+        # Case and whitespace differences in the query share one entry
+        normalized_query = " ".join(query.lower().split())
+        cache_key = hashlib.blake2b(
+            repr((normalized_query, language, max_results, ret_type)).encode(),
+            digest_size=16
+        ).hexdigest()
         cached_result = self._get_from_cache(cache_key)
         if cached_result:
             return cached_result
@@ -105,12 +126,26 @@ class MedlinePlusAPI:
         if self.email:
             params['email'] = self.email
 
+        # An expired result is revalidated rather than downloaded again
+        validator = self._get_validator(cache_key)
+        headers = {'If-None-Match': validator[0]} if validator else None
+
         try:
-            response = requests.get(self.BASE_URL, params=params)
-            response.raise_for_status()
-            
-            # Parse XML response
-            root = ET.fromstring(response.content)
+            # Parse the XML response as it streams in
+            with self._concurrency, self.session.get(
+                self.BASE_URL,
+                params=params,
+                headers=headers,
+                timeout=DEFAULT_TIMEOUT,
+                stream=True
+            ) as response:
+                if response.status_code == 304 and validator:
+                    self._add_to_cache(cache_key, validator[1], validator[0])
+                    return validator[1]
+                response.raise_for_status()
+                etag = response.headers.get('ETag')
+                response.raw.decode_content = True
+                root = ET.parse(response.raw).getroot()
             
             result = {
                 'count': int(root.find('count').text) if root.find('count') is not None else 0,
@@ -150,15 +185,15 @@ class MedlinePlusAPI:
                 result['topics'].append(topic)
 
             # Cache the result
-            self._add_to_cache(cache_key, result)
+            self._add_to_cache(cache_key, result, etag)
             return result
 
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, urllib3.exceptions.HTTPError) as e:
             raise MedlinePlusError(f"Failed to fetch data from MedlinePlus: {str(e)}")
-        except ET.ParseError as e:
+        except ET.XMLSyntaxError as e:
             raise MedlinePlusError(f"Failed to parse MedlinePlus response: {str(e)}")
 
-    def _clean_xml_text(self, element: ET.Element) -> str:
+    def _clean_xml_text(self, element: ET._Element) -> str:
         """Clean XML text by removing highlighting tags while preserving the text"""
-        text = ''.join(element.itertext())
+        text = ET.tostring(element, method="text", encoding="unicode", with_tail=False)
         return text.strip() 
\ No newline at end of file
@@ -1,48 +1,232 @@
+import io
+import re
+import sys
 import os
 import time
 import logging
-from typing import List, Dict, Any, Optional
+import threading
+import hashlib
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Iterator, Iterable, Tuple, BinaryIO, Callable, Union
 from dotenv import load_dotenv
-from Bio import Entrez, Medline
-import xml.etree.ElementTree as ET
-from openai import OpenAI
-import json
+from lxml import etree as ET
+from openai import OpenAI, AsyncOpenAI
+import httpx
+import orjson
+import requests
 from tenacity import retry, stop_after_attempt, wait_exponential
+from http_session import create_session, DEFAULT_TIMEOUT
+from cachetools import TTLCache
+import ahocorasick
+from diskcache import Cache
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
 # Load environment variables
 load_dotenv()
 
-# Configure Entrez
-Entrez.email = os.getenv("PUBMED_EMAIL")
-Entrez.api_key = os.getenv("PUBMED_API_KEY")
+# Configure E-utilities contact details
+PUBMED_EMAIL = os.getenv("PUBMED_EMAIL")
+PUBMED_API_KEY = os.getenv("PUBMED_API_KEY")
+
+# E-utilities endpoint and request batching
+EUTILS_BASE_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils"
+EFETCH_BATCH_SIZE = 50  # IDs per EFetch request; smaller batches parse in parallel
+EFETCH_CONCURRENCY = 3  # Concurrent EFetch requests per call, within NCBI's rate limits
+
+class EutilsRateLimiter:
+    """
+    Space E-utilities requests evenly so a process never exceeds NCBI's per-second limit.
+    Slots are handed out under a thread lock, so sync and async callers share one schedule.
+    """
+    def __init__(self, requests_per_second: float):
+        self.interval = 1.0 / requests_per_second
+        self.next_slot = 0.0
+        self.lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """
+        Claim the next request slot and return how long to wait for it.
+        """
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+            return slot - now
+
+    def wait(self) -> None:
+        """
+        Block the calling thread until its request slot comes up.
+        """
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def await_slot(self) -> None:
+        """
+        Sleep the calling coroutine until its request slot comes up.
+        """
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+# NCBI allows 3 requests per second per client, or 10 with an API key. The limit
+# applies per process; with several workers, set NCBI_REQUESTS_PER_SECOND to their share.
+NCBI_REQUESTS_PER_SECOND = float(os.getenv("NCBI_REQUESTS_PER_SECOND", "10" if PUBMED_API_KEY else "3"))
+eutils_rate_limiter = EutilsRateLimiter(NCBI_REQUESTS_PER_SECOND)
+
+def create_http_client() -> httpx.AsyncClient:
+    """
+    Create a pooled HTTP/2 client for async E-utilities calls.
+    """
+    return httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+        timeout=httpx.Timeout(30.0, connect=5.0)
+    )
+
+# Default clients for callers that don't supply their own, built on first use
+# so workers that pass in their own clients never open these
+_default_clients: Dict[str, Any] = {}
+_default_clients_lock = threading.Lock()
+
+def _default_client(name: str, factory: Callable[[], Any]) -> Any:
+    """
+    Return the named default client, creating it on first use.
+    """
+    with _default_clients_lock:
+        if name not in _default_clients:
+            _default_clients[name] = factory()
+        return _default_clients[name]
+
+def _default_openai() -> OpenAI:
+    """
+    Default sync OpenAI client.
+    """
+    return _default_client("openai", lambda: OpenAI(api_key=os.getenv("OPENAI_API_KEY")))
+
+def _default_async_openai() -> AsyncOpenAI:
+    """
+    Default async OpenAI client.
+    """
+    return _default_client("async_openai", lambda: AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY")))
+
+def _default_http_client() -> httpx.AsyncClient:
+    """
+    Default async E-utilities HTTP client.
+    """
+    return _default_client("http", create_http_client)
+
+def _default_eutils_session() -> requests.Session:
+    """
+    Default pooled E-utilities requests session.
+    """
+    return _default_client("eutils", create_session)
+
+# Processed query results keyed on the normalized request, shared by the sync and async paths
+_result_cache = TTLCache(maxsize=2048, ttl=60 * 60)
+_result_cache_lock = threading.Lock()
+
+# GPT-generated PubMed queries keyed on a hash of the normalized user input.
+# Filters are appended per request, so one entry serves every filter combination.
+_query_cache = TTLCache(maxsize=4096, ttl=24 * 60 * 60)
+_query_cache_lock = threading.Lock()
+
+# ESearch results keyed on (PubMed query, max results); different questions often map to the same query
+_search_cache = TTLCache(maxsize=1024, ttl=60 * 60)
+_search_cache_lock = threading.Lock()
+
+# A publication date clause, wherever it sits in the query
+_PDAT_RE = re.compile(r"\s+AND\s+[^\s()]+\[pdat\]", re.IGNORECASE)
+
+# Leading four-digit year of a "YYYY Mon" publication date
+_YEAR_RE = re.compile(r"^\d{4}")
 
-# Configure OpenAI
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# On-disk second level for the query cache, shared by workers and kept across restarts
+QUERY_DISK_CACHE_TTL = 7 * 24 * 60 * 60
+# Kept under the user's cache directory rather than a world-writable temp path
+QUERY_DISK_CACHE_DIR = os.getenv(
+    "PUBMED_QUERY_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "pubmed-search-api", "query_cache")
+)
+QUERY_DISK_CACHE_SIZE = 200 * 1024 * 1024
+
+# Opened on first use; False once opening failed, so only the memory layer is used
+_query_disk_cache: Union[Cache, None, bool] = None
+_query_disk_cache_lock = threading.Lock()
+
+def _get_query_disk_cache() -> Optional[Cache]:
+    """
+    Return the on-disk query cache, opening it on first use.
+    If the directory can't be created or opened, log once and return None.
+    """
+    global _query_disk_cache
+    with _query_disk_cache_lock:
+        if _query_disk_cache is None:
+            try:
+                _query_disk_cache = Cache(QUERY_DISK_CACHE_DIR, size_limit=QUERY_DISK_CACHE_SIZE)
+            except Exception as e:
+                logger.warning(f"Query disk cache unavailable at {QUERY_DISK_CACHE_DIR}, using memory only: {str(e)}")
+                _query_disk_cache = False
+        # An empty Cache is falsy, so compare against the failure marker explicitly
+        return None if _query_disk_cache is False else _query_disk_cache
 
 class PubMedSearchError(Exception):
     """Custom exception for PubMed search errors"""
     pass
 
-@retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
-def convert_to_pubmed_query(user_input: str, year_filter: str = "5") -> str:
+async def aclose_clients() -> None:
     """
-    Convert natural language query to PubMed-compatible search string using GPT.
-    Includes date filtering based on user preference.
+    Close whichever default clients were created. Called on application shutdown.
     """
-    try:
-        # Calculate the year range for the filter
-        date_filter = ""
-        if year_filter:
-            date_filter = f" AND {year_filter}[pdat]"
-        
-        prompt = f"""Convert the following natural language question into an effective PubMed search query.
+    with _default_clients_lock:
+        clients = dict(_default_clients)
+        _default_clients.clear()
+    if "http" in clients:
+        await clients["http"].aclose()
+    if "async_openai" in clients:
+        await clients["async_openai"].close()
+    if "openai" in clients:
+        clients["openai"].close()
+    if "eutils" in clients:
+        clients["eutils"].close()
+
+def _date_filter(year_filter: str) -> str:
+    """
+    Build the PubMed publication date clause for the given filter.
+    """
+    return f" AND {year_filter}[pdat]" if year_filter else ""
+
+def _publication_type_filter(article_types: Optional[List[str]]) -> str:
+    """
+    Build a PubMed publication type clause so NCBI filters by article type.
+    Known types use their PubMed search term; any other type must be a plain name
+    and is quoted, so caller input can't add operators or fields to the query.
+    """
+    if not article_types:
+        return ""
+    terms = []
+    for article_type in article_types:
+        term = _TYPE_SEARCH_TERMS.get(normalize_publication_type(article_type))
+        if term is None:
+            if not _PUB_TYPE_NAME_RE.fullmatch(article_type):
+                logger.warning(f"Ignoring invalid article type: {article_type!r}")
+                continue
+            term = f'"{article_type.strip()}"[pt]'
+        if term not in terms:
+            terms.append(term)
+    if not terms:
+        return ""
+    return " AND (" + " OR ".join(terms) + ")"
+
+def _query_messages(user_input: str) -> List[Dict[str, str]]:
+    """
+    Build the GPT messages used to convert a natural language query.
+    """
+    prompt = f"""Convert the following natural language question into an effective PubMed search query.
         Guidelines:
         1. Use broad matching with OR operators between synonyms
         2. Avoid using too many MeSH terms as they can be too restrictive
@@ -61,16 +245,124 @@ def convert_to_pubmed_query(user_input: str, year_filter: str = "5") -> str:
         Input: {user_input}
         Output format: Just return the PubMed search string, nothing else."""
 
-        logger.info(f"Sending query to GPT: {user_input}")
-        response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": "You are a PubMed search expert. Create effective, broad search strings that will find relevant results without being too restrictive. Focus on key concepts and use OR operators for synonyms."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0
+    return [
+        {"role": "system", "content": "You are a PubMed search expert. Create effective, broad search strings that will find relevant results without being too restrictive. Focus on key concepts and use OR operators for synonyms."},
+        {"role": "user", "content": prompt}
+    ]
+
+def _normalize_text(text: str) -> str:
+    """
+    Lowercase text and collapse runs of whitespace.
+    """
+    return " ".join(text.lower().split())
+
+def _query_cache_key(user_input: str) -> str:
+    """
+    Hash the normalized user input to a fixed-size query cache key.
+    """
+    return hashlib.blake2b(_normalize_text(user_input).encode(), digest_size=16).hexdigest()
+
+def _get_memory_cached_query(cache_key: str) -> Optional[str]:
+    """
+    Return the GPT query for this input from the in-memory cache, if there is one.
+    """
+    with _query_cache_lock:
+        return _query_cache.get(cache_key)
+
+def _get_disk_cached_query(cache_key: str) -> Optional[str]:
+    """
+    Return the GPT query for this input from the disk cache, promoting it to memory.
+    The disk cache is best-effort: errors are logged and treated as a miss.
+    """
+    disk_cache = _get_query_disk_cache()
+    if disk_cache is None:
+        return None
+    try:
+        base_query = disk_cache.get(cache_key)
+    except Exception as e:
+        logger.warning(f"Query disk cache read failed: {str(e)}")
+        return None
+    if base_query is not None:
+        with _query_cache_lock:
+            _query_cache[cache_key] = base_query
+    return base_query
+
+def _store_disk_cached_query(cache_key: str, base_query: str) -> None:
+    """
+    Write a GPT query to the disk cache, logging rather than raising on failure.
+    """
+    disk_cache = _get_query_disk_cache()
+    if disk_cache is None:
+        return
+    try:
+        disk_cache.set(cache_key, base_query, expire=QUERY_DISK_CACHE_TTL)
+    except Exception as e:
+        logger.warning(f"Query disk cache write failed: {str(e)}")
+
+def _get_cached_query(cache_key: str) -> Optional[str]:
+    """
+    Return the cached GPT query for this input, if there is one.
+    Checks memory first, then the disk cache.
+    """
+    base_query = _get_memory_cached_query(cache_key)
+    if base_query is None:
+        base_query = _get_disk_cached_query(cache_key)
+    return base_query
+
+async def _aget_cached_query(cache_key: str) -> Optional[str]:
+    """
+    Async variant of _get_cached_query; the disk lookup runs off the event loop.
+    """
+    base_query = _get_memory_cached_query(cache_key)
+    if base_query is None:
+        base_query = await asyncio.to_thread(_get_disk_cached_query, cache_key)
+    return base_query
+
+def _add_cached_query(cache_key: str, base_query: str) -> None:
+    """
+    Store a GPT-generated query before filters are appended.
+    """
+    with _query_cache_lock:
+        _query_cache[cache_key] = base_query
+    _store_disk_cached_query(cache_key, base_query)
+
+async def _aadd_cached_query(cache_key: str, base_query: str) -> None:
+    """
+    Async variant of _add_cached_query; the disk write runs off the event loop.
+    """
+    with _query_cache_lock:
+        _query_cache[cache_key] = base_query
+    await asyncio.to_thread(_store_disk_cached_query, cache_key, base_query)
+
+@retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
+def convert_to_pubmed_query(
+    user_input: str,
+    year_filter: str = "5",
+    article_types: Optional[List[str]] = None
+) -> str:
+    """
+    Convert natural language query to PubMed-compatible search string using GPT.
+    Includes date and article type filtering based on user preference.
+    The GPT output is cached per normalized input, in memory and on disk.
+    """
+    try:
+        cache_key = _query_cache_key(user_input)
+        base_query = _get_cached_query(cache_key)
+        if base_query is None:
+            logger.info(f"Sending query to GPT: {user_input}")
+            response = _default_openai().chat.completions.create(
+                model="gpt-4",
+                messages=_query_messages(user_input),
+                temperature=0
+            )
+            base_query = response.choices[0].message.content.strip()
+            _add_cached_query(cache_key, base_query)
+        # The date clause must stay last so it can be dropped on an empty search
+        query = (
+            base_query
+            + _publication_type_filter(article_types)
+            + _date_filter(year_filter)
         )
-        query = response.choices[0].message.content.strip() + date_filter
         logger.info(f"Generated PubMed query: {query}")
         return query
     except Exception as e:
@@ -78,71 +370,244 @@ def convert_to_pubmed_query(user_input: str, year_filter: str = "5") -> str:
         raise PubMedSearchError(f"Failed to convert query: {str(e)}")
 
 @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
-def search_pubmed(query: str, max_results: int = 5) -> Dict[str, Any]:
+async def aconvert_to_pubmed_query(
+    user_input: str,
+    year_filter: str = "5",
+    article_types: Optional[List[str]] = None,
+    oai: Optional[AsyncOpenAI] = None
+) -> str:
     """
-    Search PubMed using the provided query string.
+    Async variant of convert_to_pubmed_query.
     """
+    oai = oai or _default_async_openai()
     try:
-        logger.info(f"Searching PubMed with query: {query}, max_results: {max_results}")
-        handle = Entrez.esearch(
+        cache_key = _query_cache_key(user_input)
+        base_query = await _aget_cached_query(cache_key)
+        if base_query is None:
+            logger.info(f"Sending query to GPT: {user_input}")
+            response = await oai.chat.completions.create(
+                model="gpt-4",
+                messages=_query_messages(user_input),
+                temperature=0
+            )
+            base_query = response.choices[0].message.content.strip()
+            await _aadd_cached_query(cache_key, base_query)
+        # The date clause must stay last so it can be dropped on an empty search
+        query = (
+            base_query
+            + _publication_type_filter(article_types)
+            + _date_filter(year_filter)
+        )
+        logger.info(f"Generated PubMed query: {query}")
+        return query
+    except Exception as e:
+        logger.error(f"Error in aconvert_to_pubmed_query: {str(e)}")
+        raise PubMedSearchError(f"Failed to convert query: {str(e)}")
+
+def _without_date_filter(query: str) -> str:
+    """
+    Remove the date filter clause from a PubMed query, keeping every other clause.
+    """
+    return _PDAT_RE.sub("", query).strip()
+
+def _get_cached_search(cache_key: Tuple[str, int]) -> Optional[Dict[str, Any]]:
+    """
+    Return cached ESearch results for this query, if there are any.
+    """
+    with _search_cache_lock:
+        return _search_cache.get(cache_key)
+
+def _add_cached_search(cache_key: Tuple[str, int], search_results: Dict[str, Any]) -> None:
+    """
+    Store ESearch results for later identical queries.
+    """
+    with _search_cache_lock:
+        _search_cache[cache_key] = search_results
+
+def _eutils_params(**params: Any) -> Dict[str, Any]:
+    """
+    Add the configured contact email and API key to E-utilities parameters.
+    """
+    if PUBMED_EMAIL:
+        params["email"] = PUBMED_EMAIL
+    if PUBMED_API_KEY:
+        params["api_key"] = PUBMED_API_KEY
+    return params
+
+def _esearch_result(content: bytes) -> Dict[str, Any]:
+    """
+    Extract the search result from an ESearch JSON response.
+    """
+    result = orjson.loads(content)["esearchresult"]
+    if "ERROR" in result:
+        raise PubMedSearchError(f"ESearch error: {result['ERROR']}")
+    return result
+
+def _esearch(term: str, max_results: int, session: requests.Session) -> Dict[str, Any]:
+    """
+    Run a single ESearch request on the given session.
+    """
+    eutils_rate_limiter.wait()
+    response = session.get(
+        f"{EUTILS_BASE_URL}/esearch.fcgi",
+        params=_eutils_params(
             db="pubmed",
-            term=query,
+            term=term,
             retmax=max_results,
             usehistory="y",
             sort="relevance",
-            retmode="xml"
-        )
-        search_results = Entrez.read(handle)
-        handle.close()
+            retmode="json"
+        ),
+        timeout=DEFAULT_TIMEOUT
+    )
+    response.raise_for_status()
+    return _esearch_result(response.content)
+
+@retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
+def search_pubmed(
+    query: str,
+    max_results: int = 5,
+    session: Optional[requests.Session] = None
+) -> Dict[str, Any]:
+    """
+    Search PubMed using the provided query string.
+    Results are cached for an hour per query and result limit.
+    """
+    session = session or _default_eutils_session()
+    cache_key = (query, max_results)
+    cached = _get_cached_search(cache_key)
+    if cached is not None:
+        return cached
+    try:
+        logger.info(f"Searching PubMed with query: {query}, max_results: {max_results}")
+        search_results = _esearch(query, max_results, session)
         
-        if int(search_results["Count"]) == 0:
+        if int(search_results["count"]) == 0:
             # If no results, try without the date filter
             if "[pdat]" in query:
                 logger.info("No results found with date filter, trying without it")
-                query_without_date = query.split(" AND ")[:-1]  # Remove the date filter
-                handle = Entrez.esearch(
-                    db="pubmed",
-                    term=" AND ".join(query_without_date),
-                    retmax=max_results,
-                    usehistory="y",
-                    sort="relevance",
-                    retmode="xml"
-                )
-                search_results = Entrez.read(handle)
-                handle.close()
+                search_results = _esearch(_without_date_filter(query), max_results, session)
                 
-        logger.info(f"Found {search_results['Count']} results")
+        logger.info(f"Found {search_results['count']} results")
+        _add_cached_search(cache_key, search_results)
         return search_results
     except Exception as e:
         logger.error(f"Error in search_pubmed: {str(e)}")
         raise PubMedSearchError(f"Failed to search PubMed: {str(e)}")
 
+async def _aesearch(term: str, max_results: int, http: httpx.AsyncClient) -> Dict[str, Any]:
+    """
+    Run a single ESearch request on the given HTTP client.
+    """
+    await eutils_rate_limiter.await_slot()
+    response = await http.get(
+        f"{EUTILS_BASE_URL}/esearch.fcgi",
+        params=_eutils_params(
+            db="pubmed",
+            term=term,
+            retmax=max_results,
+            usehistory="y",
+            sort="relevance",
+            retmode="json"
+        )
+    )
+    response.raise_for_status()
+    return _esearch_result(response.content)
+
+@retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
+async def asearch_pubmed(
+    query: str,
+    max_results: int = 5,
+    http: Optional[httpx.AsyncClient] = None
+) -> Dict[str, Any]:
+    """
+    Async variant of search_pubmed using the given or the shared HTTP client.
+    """
+    http = http or _default_http_client()
+    cache_key = (query, max_results)
+    cached = _get_cached_search(cache_key)
+    if cached is not None:
+        return cached
+    try:
+        logger.info(f"Searching PubMed with query: {query}, max_results: {max_results}")
+        search_results = await _aesearch(query, max_results, http)
+        
+        if int(search_results["count"]) == 0 and "[pdat]" in query:
+            logger.info("No results found with date filter, trying without it")
+            search_results = await _aesearch(_without_date_filter(query), max_results, http)
+                
+        logger.info(f"Found {search_results['count']} results")
+        _add_cached_search(cache_key, search_results)
+        return search_results
+    except Exception as e:
+        logger.error(f"Error in asearch_pubmed: {str(e)}")
+        raise PubMedSearchError(f"Failed to search PubMed: {str(e)}")
+
+# Map common variations to standard forms, in matching priority order
+_TYPE_MAPPING = (
+    ('clinical trial', ('clinical trial', 'clinical study', 'clinical research', 'interventional study')),
+    ('randomized controlled trial', ('randomized controlled trial', 'randomised controlled trial', 'rct')),
+    ('systematic review', ('systematic review', 'systematic literature review', 'systematic analysis')),
+    ('meta analysis', ('meta analysis', 'metaanalysis', 'meta analytical study')),
+    ('case report', ('case report', 'case study', 'patient case')),
+    ('review', ('review', 'literature review', 'narrative review')),
+    ('comparative study', ('comparative study', 'comparison study', 'comparative analysis')),
+    ('observational study', ('observational study', 'observational research')),
+    ('cohort study', ('cohort study', 'cohort analysis')),
+    ('case control study', ('case control study', 'case control'))
+)
+_PUB_PUNCT = str.maketrans('-/', '  ')
+
+# PubMed search term for each standard type. Cohort and case-control studies
+# have no publication type tag in PubMed, so they match on their MeSH heading.
+_TYPE_SEARCH_TERMS = {
+    'clinical trial': '"Clinical Trial"[pt]',
+    'randomized controlled trial': '"Randomized Controlled Trial"[pt]',
+    'systematic review': '"Systematic Review"[pt]',
+    'meta analysis': '"Meta-Analysis"[pt]',
+    'case report': '"Case Reports"[pt]',
+    'review': '"Review"[pt]',
+    'comparative study': '"Comparative Study"[pt]',
+    'observational study': '"Observational Study"[pt]',
+    'cohort study': '"Cohort Studies"[mh]',
+    'case control study': '"Case-Control Studies"[mh]'
+}
+
+# Other publication types are accepted only as plain names: no quotes, brackets or wildcards
+_PUB_TYPE_NAME_RE = re.compile(r"\s*[A-Za-z0-9][A-Za-z0-9 ,'-]*\s*")
+
+def _build_type_automaton() -> ahocorasick.Automaton:
+    """
+    Compile every publication type variation into one Aho-Corasick automaton.
+    Each variation maps to (priority, standard type) so overlapping matches
+    resolve to the same standard type the mapping order would pick.
+    """
+    automaton = ahocorasick.Automaton()
+    for priority, (standard_type, variations) in enumerate(_TYPE_MAPPING):
+        for variation in variations:
+            # A variation listed under two standard types keeps the earlier one
+            if automaton.exists(variation):
+                continue
+            automaton.add_word(variation, (priority, standard_type))
+    automaton.make_automaton()
+    return automaton
+
+_TYPE_AUTOMATON = _build_type_automaton()
+
+@lru_cache(maxsize=512)
 def normalize_publication_type(pub_type: str) -> str:
     """
     Normalize publication type strings for better matching.
     Handles common variations in how publication types are written.
+    Publication types repeat heavily, so results are memoized.
     """
     # Remove punctuation and convert to lowercase
-    normalized = pub_type.lower().replace('-', ' ').replace('/', ' ').strip()
-    
-    # Map common variations to standard forms
-    type_mapping = {
-        'clinical trial': ['clinical trial', 'clinical study', 'clinical research', 'interventional study'],
-        'randomized controlled trial': ['randomized controlled trial', 'randomised controlled trial', 'rct'],
-        'systematic review': ['systematic review', 'systematic literature review', 'systematic analysis'],
-        'meta analysis': ['meta analysis', 'metaanalysis', 'meta analytical study'],
-        'case report': ['case report', 'case study', 'patient case'],
-        'review': ['review', 'literature review', 'narrative review'],
-        'comparative study': ['comparative study', 'comparison study', 'comparative analysis'],
-        'observational study': ['observational study', 'observational research'],
-        'cohort study': ['cohort study', 'cohort analysis'],
-        'case control study': ['case control study', 'case control']
-    }
+    normalized = pub_type.lower().translate(_PUB_PUNCT).strip()
     
-    # Check if the normalized type matches any of the standard variations
-    for standard_type, variations in type_mapping.items():
-        if any(variation in normalized for variation in variations):
-            return standard_type
+    # Find every variation in one pass; earlier standard types win
+    matches = [match for _, match in _TYPE_AUTOMATON.iter(normalized)]
+    if matches:
+        return min(matches)[1]
             
     return normalized
 
@@ -156,211 +621,370 @@ def match_publication_type(article_type: str, pub_types: List[str]) -> bool:
     
     return any(normalized_request in pt for pt in normalized_types)
 
+@dataclass(slots=True)
+class Article:
+    """Bibliographic details of a single PubMed article."""
+    pmid: str
+    title: str
+    abstract: str
+    authors: List[str]
+    journal: str
+    publication_date: str
+    doi: Optional[str]
+    mesh_terms: List[str]
+    publication_types: List[str]
+    keywords: List[str]
+    affiliations: List[str]
+    pmc_id: Optional[str]
+
+    @property
+    def urls(self) -> Dict[str, Optional[str]]:
+        return {
+            "pubmed": f"https://pubmed.ncbi.nlm.nih.gov/{self.pmid}",
+            "doi": f"https://doi.org/{self.doi}" if self.doi else None,
+            "pmc": f"https://www.ncbi.nlm.nih.gov/pmc/articles/{self.pmc_id}" if self.pmc_id else None
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert to the JSON-ready dict returned by the API.
+        """
+        return {
+            "pmid": self.pmid,
+            "title": self.title,
+            "abstract": self.abstract,
+            "authors": self.authors,
+            "journal": self.journal,
+            "publication_date": self.publication_date,
+            "doi": self.doi,
+            "mesh_terms": self.mesh_terms,
+            "publication_types": self.publication_types,
+            "keywords": self.keywords,
+            "affiliations": self.affiliations,
+            "pmc_id": self.pmc_id,
+            "urls": self.urls
+        }
+
+def _released(events: Iterable[Tuple[str, ET._Element]]) -> Iterator[ET._Element]:
+    """
+    Yield PubmedArticle elements from parser "end" events. Each article and
+    the siblings before it are freed once the caller moves on, so only one
+    article's tree is held in memory at a time.
+    """
+    for _, article in events:
+        yield article
+        article.clear()
+        while article.getprevious() is not None:
+            del article.getparent()[0]
+
+def _extract_article(article: ET._Element) -> Article:
+    """
+    Extract article details in a single pass over a PubmedArticle element.
+    Tags that occur in several places (PMID, Title, Affiliation, ...) are
+    told apart by their parent, mirroring the paths they are read from.
+    Low-cardinality strings (journal, MeSH, publication types) are interned
+    so repeats across a result set share one object.
+    """
+    pmid = None
+    title = ""
+    abstract = None
+    authors = []
+    journal_title = None
+    pub_date_str = None
+    doi = None
+    pmc_id = None
+    mesh_terms = []
+    pub_types = {}  # Insertion-ordered set of normalized types
+    keywords = []
+    affiliations = []
+    
+    for elem in article.iter():
+        tag = elem.tag
+        parent = elem.getparent()
+        parent_tag = parent.tag if parent is not None else None
+        
+        if tag == "PMID":
+            # Later PMIDs belong to comments and corrections
+            if pmid is None:
+                pmid = elem.text
+        elif tag == "ArticleTitle":
+            if parent_tag == "Article":
+                # Titles often start with inline markup such as <i>, so elem.text alone can be None
+                title = "".join(elem.itertext())
+        elif tag == "AbstractText":
+            if parent_tag == "Abstract" and abstract is None:
+                abstract = "".join(elem.itertext()) or None
+        elif tag == "Author":
+            if parent_tag == "AuthorList":
+                last_name = elem.find("LastName")
+                fore_name = elem.find("ForeName")
+                if last_name is not None and fore_name is not None:
+                    authors.append(f"{last_name.text}, {fore_name.text}")
+                elif last_name is not None:
+                    authors.append(last_name.text)
+        elif tag == "Title":
+            if parent_tag == "Journal" and journal_title is None and elem.text:
+                journal_title = sys.intern(elem.text)
+        elif tag == "PubDate":
+            if pub_date_str is None:
+                year = elem.findtext("Year") or ""
+                month = elem.findtext("Month") or ""
+                pub_date_str = f"{year} {month}".strip()
+        elif tag == "ArticleId":
+            id_type = elem.get("IdType")
+            if id_type == "doi" and doi is None:
+                doi = elem.text
+            elif id_type == "pmc" and pmc_id is None:
+                pmc_id = elem.text
+        elif tag == "DescriptorName":
+            if parent_tag == "MeshHeading" and elem.text:
+                mesh_terms.append(sys.intern(elem.text))
+        elif tag == "PublicationType":
+            if elem.text:
+                # Normalize and avoid duplicates
+                pub_types[sys.intern(normalize_publication_type(elem.text))] = None
+        elif tag == "Keyword":
+            if elem.text:
+                keywords.append(elem.text)
+        elif tag == "Affiliation":
+            # Investigators have affiliations too; keep only the authors'
+            if elem.text and parent is not None and parent.getparent().tag == "Author":
+                affiliations.append(elem.text)
+    
+    if pmid is None:
+        raise ValueError("PubmedArticle has no PMID")
+    
+    return Article(
+        pmid=pmid,
+        title=title,
+        abstract=abstract if abstract is not None else "No abstract available",
+        authors=authors,
+        journal=journal_title or "",
+        publication_date=pub_date_str or "",
+        doi=doi,
+        mesh_terms=mesh_terms,
+        publication_types=list(pub_types),
+        keywords=keywords,
+        affiliations=affiliations,
+        pmc_id=pmc_id
+    )
+
+def _parse_articles(source: BinaryIO) -> List[Article]:
+    """
+    Parse PubmedArticle elements while an EFetch XML document is read from source.
+    """
+    return _parse_article_elements(
+        _released(ET.iterparse(source, events=("end",), tag="PubmedArticle"))
+    )
+
+def _parse_article_elements(elements: Iterable[ET._Element]) -> List[Article]:
+    """
+    Extract details from PubmedArticle elements, skipping any that fail to parse.
+    """
+    articles = []
+    
+    for article in elements:
+        try:
+            articles.append(_extract_article(article))
+        except Exception as e:
+            logger.error(f"Error parsing article {article.findtext('MedlineCitation/PMID')}: {str(e)}")
+            continue
+    
+    return articles
+
+def _efetch_params(pmids: List[str]) -> Dict[str, Any]:
+    """
+    Build EFetch parameters for one batch of PubMed IDs.
+    """
+    return _eutils_params(
+        db="pubmed",
+        id=",".join(pmids),
+        rettype="xml",
+        retmode="xml"
+    )
+
+def _batches(pmids: List[str], batch_size: int) -> List[List[str]]:
+    """
+    Split PubMed IDs into consecutive batches of at most batch_size.
+    """
+    return [pmids[i:i + batch_size] for i in range(0, len(pmids), batch_size)]
+
+def _efetch_batch(pmids: List[str], session: requests.Session) -> List[Article]:
+    """
+    Fetch and parse one batch of articles on the given session.
+    The body is parsed as it streams in rather than after it has fully arrived.
+    """
+    eutils_rate_limiter.wait()
+    with session.get(
+        f"{EUTILS_BASE_URL}/efetch.fcgi",
+        params=_efetch_params(pmids),
+        timeout=DEFAULT_TIMEOUT,
+        stream=True
+    ) as response:
+        response.raise_for_status()
+        response.raw.decode_content = True
+        return _parse_articles(response.raw)
+
+async def _aefetch_batch(
+    pmids: List[str],
+    http: httpx.AsyncClient,
+    semaphore: asyncio.Semaphore
+) -> List[Article]:
+    """
+    Fetch and parse one batch of articles on the given HTTP client.
+    Articles are parsed from each chunk of the body as it is received.
+    """
+    articles = []
+    async with semaphore:
+        await eutils_rate_limiter.await_slot()
+        async with http.stream("GET", f"{EUTILS_BASE_URL}/efetch.fcgi", params=_efetch_params(pmids)) as response:
+            response.raise_for_status()
+            parser = ET.XMLPullParser(events=("end",), tag="PubmedArticle")
+            async for data in response.aiter_bytes():
+                parser.feed(data)
+                articles.extend(_parse_article_elements(_released(parser.read_events())))
+            parser.close()
+            articles.extend(_parse_article_elements(_released(parser.read_events())))
+    return articles
+
 @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
-def fetch_article_details(search_results: Dict[str, Any]) -> List[Dict[str, Any]]:
+def fetch_article_details(
+    search_results: Dict[str, Any],
+    session: Optional[requests.Session] = None,
+    batch_size: int = EFETCH_BATCH_SIZE
+) -> List[Article]:
     """
     Fetch detailed information for articles found in search using XML format.
+    IDs are sent to EFetch in batches of up to batch_size, with up to
+    EFETCH_CONCURRENCY batches in flight; articles keep the search ranking.
     """
+    session = session or _default_eutils_session()
     try:
-        pmids = search_results.get("IdList", [])
+        pmids = search_results.get("idlist", [])
         if not pmids:
             return []
 
         logger.info(f"Fetching details for {len(pmids)} articles")
-        handle = Entrez.efetch(
-            db="pubmed",
-            id=",".join(pmids),
-            rettype="xml",
-            retmode="xml"
-        )
+        batches = _batches(pmids, batch_size)
+        with ThreadPoolExecutor(max_workers=min(EFETCH_CONCURRENCY, len(batches))) as executor:
+            # map() yields in submission order, preserving the search ranking
+            parsed = list(executor.map(lambda batch: _efetch_batch(batch, session), batches))
+        articles = [article for batch_articles in parsed for article in batch_articles]
         
-        articles = []
-        tree = ET.parse(handle)
-        root = tree.getroot()
+        logger.info(f"Successfully parsed {len(articles)} articles")
+        return articles
         
-        for article in root.findall(".//PubmedArticle"):
-            try:
-                # Extract basic metadata
-                pmid = article.find(".//PMID").text
-                article_meta = article.find(".//Article")
-                
-                # Get title
-                title = article_meta.find(".//ArticleTitle").text if article_meta.find(".//ArticleTitle") is not None else ""
-                
-                # Get abstract
-                abstract_element = article_meta.find(".//Abstract/AbstractText")
-                abstract = abstract_element.text if abstract_element is not None else "No abstract available"
-                
-                # Get authors
-                authors = []
-                author_list = article_meta.findall(".//Author")
-                for author in author_list:
-                    last_name = author.find("LastName")
-                    fore_name = author.find("ForeName")
-                    if last_name is not None and fore_name is not None:
-                        authors.append(f"{last_name.text}, {fore_name.text}")
-                    elif last_name is not None:
-                        authors.append(last_name.text)
-                
-                # Get journal info
-                journal = article_meta.find(".//Journal")
-                journal_title = journal.find(".//Title").text if journal.find(".//Title") is not None else ""
-                
-                # Get publication date
-                pub_date = journal.find(".//PubDate")
-                year = pub_date.find("Year")
-                month = pub_date.find("Month")
-                pub_date_str = f"{year.text if year is not None else ''} {month.text if month is not None else ''}".strip()
-                
-                # Get DOI
-                doi = None
-                article_ids = article.findall(".//ArticleId")
-                for article_id in article_ids:
-                    if article_id.get("IdType") == "doi":
-                        doi = article_id.text
-                        break
-                
-                # Get MeSH terms
-                mesh_terms = []
-                mesh_headings = article.findall(".//MeshHeading")
-                for mesh in mesh_headings:
-                    descriptor = mesh.find("DescriptorName")
-                    if descriptor is not None:
-                        mesh_terms.append(descriptor.text)
-                
-                # Get publication types with normalization
-                pub_types = []
-                publication_types = article_meta.findall(".//PublicationType")
-                for pub_type in publication_types:
-                    if pub_type.text:
-                        normalized_type = normalize_publication_type(pub_type.text)
-                        if normalized_type not in pub_types:  # Avoid duplicates
-                            pub_types.append(normalized_type)
-                
-                # Get keywords
-                keywords = []
-                keyword_list = article.findall(".//Keyword")
-                for keyword in keyword_list:
-                    if keyword.text:
-                        keywords.append(keyword.text)
-                
-                # Get affiliations
-                affiliations = []
-                aff_list = article_meta.findall(".//Affiliation")
-                for aff in aff_list:
-                    if aff.text:
-                        affiliations.append(aff.text)
-                
-                # Check for PMC ID
-                pmc_id = None
-                for article_id in article_ids:
-                    if article_id.get("IdType") == "pmc":
-                        pmc_id = article_id.text
-                        break
-                
-                articles.append({
-                    "pmid": pmid,
-                    "title": title,
-                    "abstract": abstract,
-                    "authors": authors,
-                    "journal": journal_title,
-                    "publication_date": pub_date_str,
-                    "doi": doi,
-                    "mesh_terms": mesh_terms,
-                    "publication_types": pub_types,
-                    "keywords": keywords,
-                    "affiliations": affiliations,
-                    "pmc_id": pmc_id,
-                    "urls": {
-                        "pubmed": f"https://pubmed.ncbi.nlm.nih.gov/{pmid}",
-                        "doi": f"https://doi.org/{doi}" if doi else None,
-                        "pmc": f"https://www.ncbi.nlm.nih.gov/pmc/articles/{pmc_id}" if pmc_id else None
-                    }
-                })
-                
-            except Exception as e:
-                logger.error(f"Error parsing article {pmid}: {str(e)}")
-                continue
+    except Exception as e:
+        logger.error(f"Error in fetch_article_details: {str(e)}")
+        raise PubMedSearchError(f"Failed to fetch article details: {str(e)}")
+
+@retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
+async def afetch_article_details(
+    search_results: Dict[str, Any],
+    batch_size: int = EFETCH_BATCH_SIZE,
+    http: Optional[httpx.AsyncClient] = None
+) -> List[Article]:
+    """
+    Async variant of fetch_article_details using the given or the shared HTTP client.
+    """
+    http = http or _default_http_client()
+    try:
+        pmids = search_results.get("idlist", [])
+        if not pmids:
+            return []
+
+        logger.info(f"Fetching details for {len(pmids)} articles")
+        semaphore = asyncio.Semaphore(EFETCH_CONCURRENCY)
+        parsed = await asyncio.gather(
+            *(_aefetch_batch(batch, http, semaphore) for batch in _batches(pmids, batch_size))
+        )
+        articles = [article for batch_articles in parsed for article in batch_articles]
         
-        handle.close()
         logger.info(f"Successfully parsed {len(articles)} articles")
         return articles
         
     except Exception as e:
-        logger.error(f"Error in fetch_article_details: {str(e)}")
+        logger.error(f"Error in afetch_article_details: {str(e)}")
         raise PubMedSearchError(f"Failed to fetch article details: {str(e)}")
 
-def chunk_abstracts(articles: List[Dict[str, Any]], max_tokens: int = 2000) -> List[str]:
+def chunk_abstracts(articles: List[Article], max_tokens: int = 2000) -> List[str]:
     """
     Split articles into chunks that fit within token limits.
     """
     chunks = []
-    current_chunk = []
+    current_chunk = io.StringIO()
     current_length = 0
     
     for idx, article in enumerate(articles, 1):
-        # Truncate abstract if too long
-        abstract = article['abstract'][:300] + "..." if len(article['abstract']) > 300 else article['abstract']
-        article_text = f"[{idx}] Title: {article['title']}\nAbstract: {abstract}\n\n"
+        # Truncate abstract if too long; the ellipsis is written separately
+        truncated = len(article.abstract) > 300
+        abstract = article.abstract[:300] if truncated else article.abstract
+        
+        # Rough estimate of tokens (4 chars ≈ 1 token), sized from the parts
+        # rather than the formatted text; 23 is the length of the fixed labels
+        text_length = len(str(idx)) + len(article.title) + len(abstract) + (3 if truncated else 0) + 23
+        estimated_tokens = text_length >> 2
         
-        # Rough estimate of tokens (4 chars ≈ 1 token)
-        estimated_tokens = len(article_text) // 4
+        if current_length + estimated_tokens > max_tokens and current_chunk.tell():
+            chunks.append(current_chunk.getvalue())
+            current_chunk = io.StringIO()
+            current_length = 0
+        elif current_chunk.tell():
+            # Blank line between entries of the same chunk
+            current_chunk.write("\n")
         
-        if current_length + estimated_tokens > max_tokens:
-            chunks.append("\n".join(current_chunk))
-            current_chunk = [article_text]
-            current_length = estimated_tokens
-        else:
-            current_chunk.append(article_text)
-            current_length += estimated_tokens
+        current_chunk.write("[")
+        current_chunk.write(str(idx))
+        current_chunk.write("] Title: ")
+        current_chunk.write(article.title)
+        current_chunk.write("\nAbstract: ")
+        current_chunk.write(abstract)
+        if truncated:
+            current_chunk.write("...")
+        current_chunk.write("\n\n")
+        current_length += estimated_tokens
     
-    if current_chunk:
-        chunks.append("\n".join(current_chunk))
+    if current_chunk.tell():
+        chunks.append(current_chunk.getvalue())
     
     return chunks
 
-@retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
-def summarize_results(articles: List[Dict[str, Any]], user_query: str) -> Dict[str, Any]:
+def _year(publication_date: str) -> str:
     """
-    Generate a summary of the search results using GPT with numbered citations.
-    Uses multi-step summarization for larger result sets.
+    Return the year of a publication date, or an empty string if it has none.
+    """
+    match = _YEAR_RE.match(publication_date)
+    return match.group() if match else ""
+
+def _build_citations(articles: List[Article]) -> List[Dict[str, Any]]:
+    """
+    Create numbered citations with metadata for the given articles.
     """
-    if not articles:
-        return {
-            "summary": "No articles found matching your query.",
-            "citations": []
-        }
-        
-    # Create numbered citations with metadata
     citations = []
     for idx, article in enumerate(articles, 1):
         citation = {
             "number": idx,
-            "title": article['title'],
-            "authors": article['authors'],
-            "journal": article['journal'],
-            "year": article['publication_date'].split()[0] if article['publication_date'] else "",
-            "pmid": article['pmid'],
-            "doi": article['doi'],
-            "urls": article['urls'],
-            "publication_types": article['publication_types'],
-            "mesh_terms": article['mesh_terms'],
-            "keywords": article['keywords']
+            "title": article.title,
+            "authors": article.authors,
+            "journal": article.journal,
+            "year": _year(article.publication_date),
+            "pmid": article.pmid,
+            "doi": article.doi,
+            "urls": article.urls,
+            "publication_types": article.publication_types,
+            "mesh_terms": article.mesh_terms,
+            "keywords": article.keywords
         }
         citations.append(citation)
-    
-    try:
-        # Split articles into chunks if needed
-        chunks = chunk_abstracts(articles)
-        summaries = []
-        
-        # Generate summary for each chunk
-        for chunk in chunks:
-            response = client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are a scientific summarizer. Provide clear, accurate summaries with proper citation numbers."},
-                    {"role": "user", "content": f"""Summarize the following research articles related to: "{user_query}"
+    return citations
+
+def _summary_messages(chunk: str, user_query: str) -> List[Dict[str, str]]:
+    """
+    Build the GPT messages used to summarize one chunk of articles.
+    """
+    return [
+        {"role": "system", "content": "You are a scientific summarizer. Provide clear, accurate summaries with proper citation numbers."},
+        {"role": "user", "content": f"""Summarize the following research articles related to: "{user_query}"
                     Include citation numbers [1], [2], etc. when referencing specific findings.
                     
                     Articles:
@@ -374,7 +998,41 @@ def summarize_results(articles: List[Dict[str, Any]], user_query: str) -> Dict[s
                     5. Be specific about findings and their sources
                     
                     Summary:"""}
-                ],
+    ]
+
+def _combine_messages(summaries: List[str]) -> List[Dict[str, str]]:
+    """
+    Build the GPT messages used to merge partial summaries.
+    """
+    return [
+        {"role": "system", "content": "You are a scientific summarizer. Create a cohesive summary from multiple partial summaries."},
+        {"role": "user", "content": f"Combine these summaries into a single coherent summary, maintaining citation numbers and academic style:\n\n{' '.join(summaries)}"}
+    ]
+
+@retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
+def summarize_results(articles: List[Article], user_query: str) -> Dict[str, Any]:
+    """
+    Generate a summary of the search results using GPT with numbered citations.
+    Uses multi-step summarization for larger result sets.
+    """
+    if not articles:
+        return {
+            "summary": "No articles found matching your query.",
+            "citations": []
+        }
+        
+    citations = _build_citations(articles)
+    
+    try:
+        # Split articles into chunks if needed
+        chunks = chunk_abstracts(articles)
+        summaries = []
+        
+        # Generate summary for each chunk
+        for chunk in chunks:
+            response = _default_openai().chat.completions.create(
+                model="gpt-4",
+                messages=_summary_messages(chunk, user_query),
                 temperature=0,
                 max_tokens=800
             )
@@ -383,12 +1041,9 @@ def summarize_results(articles: List[Dict[str, Any]], user_query: str) -> Dict[s
         # If multiple chunks, create a final summary
         final_summary = summaries[0]
         if len(summaries) > 1:
-            response = client.chat.completions.create(
+            response = _default_openai().chat.completions.create(
                 model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are a scientific summarizer. Create a cohesive summary from multiple partial summaries."},
-                    {"role": "user", "content": f"Combine these summaries into a single coherent summary, maintaining citation numbers and academic style:\n\n{' '.join(summaries)}"}
-                ],
+                messages=_combine_messages(summaries),
                 temperature=0,
                 max_tokens=800
             )
@@ -403,38 +1058,189 @@ def summarize_results(articles: List[Dict[str, Any]], user_query: str) -> Dict[s
         logger.error(f"Error in summarize_results: {str(e)}")
         return {
             "summary": f"Error generating summary: {str(e)}",
+            "citations": citations,
+            "error": str(e)
+        }
+
+@retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
+async def _asummary_completion(oai: AsyncOpenAI, messages: List[Dict[str, str]]) -> str:
+    """
+    Run one summarization completion, retrying transient failures.
+    """
+    response = await oai.chat.completions.create(
+        model="gpt-4",
+        messages=messages,
+        temperature=0,
+        max_tokens=800
+    )
+    return response.choices[0].message.content.strip()
+
+async def asummarize_results(
+    articles: List[Article],
+    user_query: str,
+    oai: Optional[AsyncOpenAI] = None
+) -> Dict[str, Any]:
+    """
+    Async variant of summarize_results. Chunks are summarized concurrently.
+    """
+    oai = oai or _default_async_openai()
+    if not articles:
+        return {
+            "summary": "No articles found matching your query.",
+            "citations": []
+        }
+        
+    citations = _build_citations(articles)
+    
+    try:
+        # Split articles into chunks if needed
+        chunks = chunk_abstracts(articles)
+        
+        # Chunk summaries are independent, so generate them all at once
+        summaries = await asyncio.gather(
+            *(_asummary_completion(oai, _summary_messages(chunk, user_query)) for chunk in chunks)
+        )
+        
+        # If multiple chunks, create a final summary
+        final_summary = summaries[0]
+        if len(summaries) > 1:
+            final_summary = await _asummary_completion(oai, _combine_messages(summaries))
+        
+        logger.info("Successfully generated summary")
+        return {
+            "summary": final_summary,
             "citations": citations
         }
+    except Exception as e:
+        logger.error(f"Error in asummarize_results: {str(e)}")
+        return {
+            "summary": f"Error generating summary: {str(e)}",
+            "citations": citations,
+            "error": str(e)
+        }
+
+def _result_cache_key(
+    user_input: str,
+    max_results: int,
+    year_filter: str,
+    article_types: Optional[List[str]]
+) -> tuple:
+    """
+    Build a cache key that ignores case and whitespace differences in the query.
+    """
+    return (
+        _normalize_text(user_input),
+        max_results,
+        year_filter or "",
+        tuple(sorted(article_type.lower() for article_type in article_types or ()))
+    )
+
+def _get_cached_result(cache_key: tuple, user_input: str) -> Optional[Dict[str, Any]]:
+    """
+    Return a copy of a cached result for this request, if there is one.
+    """
+    with _result_cache_lock:
+        cached = _result_cache.get(cache_key)
+    if cached is None:
+        return None
+    logger.info(f"Using cached results for query: {user_input}")
+    return {**cached, "original_query": user_input}
+
+def _add_cached_result(cache_key: tuple, result: Dict[str, Any]) -> None:
+    """
+    Store a processed query result for later identical requests.
+    """
+    with _result_cache_lock:
+        _result_cache[cache_key] = result
 
 def process_query(
     user_input: str,
     max_results: int = 5,
-    year_filter: str = "5"
+    year_filter: str = "5",
+    article_types: Optional[List[str]] = None,
+    session: Optional[requests.Session] = None
 ) -> Dict[str, Any]:
     """
     Process a natural language query and return structured results.
+    E-utilities calls go through the given session, or the shared pooled one.
+    Results are cached for an hour per normalized query.
     """
+    cache_key = _result_cache_key(user_input, max_results, year_filter, article_types)
+    cached = _get_cached_result(cache_key, user_input)
+    if cached is not None:
+        return cached
+
     try:
         # Convert natural language to PubMed query
-        pubmed_query = convert_to_pubmed_query(user_input, year_filter)
+        pubmed_query = convert_to_pubmed_query(user_input, year_filter, article_types)
         
         # Search PubMed
-        search_results = search_pubmed(pubmed_query, max_results)
+        search_results = search_pubmed(pubmed_query, max_results, session=session)
         
         # Fetch article details
-        articles = fetch_article_details(search_results)
+        articles = fetch_article_details(search_results, session=session)
         
         # Generate summary and citations
         summary_data = summarize_results(articles, user_input)
         
-        return {
+        result = {
             "original_query": user_input,
             "pubmed_query": pubmed_query,
-            "total_results": search_results["Count"],
-            "articles": articles,
+            "total_results": search_results["count"],
+            "articles": [article.to_dict() for article in articles],
             "summary": summary_data["summary"],
             "citations": summary_data["citations"]
         }
+        # Don't keep a transient summarization failure around for an hour
+        if "error" not in summary_data:
+            _add_cached_result(cache_key, result)
+        return dict(result)
     except Exception as e:
         logger.error(f"Error in process_query: {str(e)}")
-        raise PubMedSearchError(f"Failed to process query: {str(e)}") 
\ No newline at end of file
+        raise PubMedSearchError(f"Failed to process query: {str(e)}")
+
+async def aprocess_query(
+    user_input: str,
+    max_results: int = 5,
+    year_filter: str = "5",
+    article_types: Optional[List[str]] = None,
+    http: Optional[httpx.AsyncClient] = None,
+    oai: Optional[AsyncOpenAI] = None
+) -> Dict[str, Any]:
+    """
+    Async variant of process_query. Network calls run on the given HTTP and
+    OpenAI clients, or the shared ones, so concurrent requests overlap on I/O.
+    """
+    cache_key = _result_cache_key(user_input, max_results, year_filter, article_types)
+    cached = _get_cached_result(cache_key, user_input)
+    if cached is not None:
+        return cached
+
+    try:
+        # Convert natural language to PubMed query
+        pubmed_query = await aconvert_to_pubmed_query(user_input, year_filter, article_types, oai=oai)
+        
+        # Search PubMed
+        search_results = await asearch_pubmed(pubmed_query, max_results, http=http)
+        
+        # Fetch article details
+        articles = await afetch_article_details(search_results, http=http)
+        
+        # Generate summary and citations
+        summary_data = await asummarize_results(articles, user_input, oai=oai)
+        
+        result = {
+            "original_query": user_input,
+            "pubmed_query": pubmed_query,
+            "total_results": search_results["count"],
+            "articles": [article.to_dict() for article in articles],
+            "summary": summary_data["summary"],
+            "citations": summary_data["citations"]
+        }
+        # Don't keep a transient summarization failure around for an hour
+        if "error" not in summary_data:
+            _add_cached_result(cache_key, result)
+        return dict(result)
+    except Exception as e:
+        logger.error(f"Error in aprocess_query: {str(e)}")
+        raise PubMedSearchError(f"Failed to process query: {str(e)}")
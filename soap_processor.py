@@ -1,16 +1,64 @@
 import re
 from typing import Dict, List, Any, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from functools import lru_cache
 from datetime import datetime
+from itertools import chain
 import logging
+import numpy as np
+import ahocorasick
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
+# Vital sign patterns, compiled once at import
+_BP_RE = re.compile(r'BP:\s*(\d+/\d+)')
+_HR_RE = re.compile(r'HR:\s*(\d+)')
+_TEMP_RE = re.compile(r'Temp:\s*([\d.]+)')
+_RR_RE = re.compile(r'RR:\s*(\d+)')
+_SPO2_RE = re.compile(r'SpO₂:\s*(\d+%)')
+_BP_PARSE_RE = re.compile(r'(\d+)/(\d+)')
+
+# Symptom patterns with variations, matched against lowercased subjective text
+# Section marker lines such as "S – Subjective", including their line break
+_SECTION_SPLIT_RE = re.compile(r'(?m)^[^\S\n]*([SOAP]) –.*\n?')
+
+# Assessment problems: non-blank lines without any dash, captured stripped
+_ASSESSMENT_RE = re.compile(r'(?m)^[^\S\n]*([^\s\-–](?:[^\n\-–]*[^\s\-–])?)[^\S\n]*$')
+
+# Plan lines: "Category:" headers or "- item" bullets, captured stripped
+_PLAN_LINE_RE = re.compile(
+    r'(?m)^[^\S\n]*(?:(?P<category>.*?):[^\S\n]*$|-[^\S\n]*(?P<item>.*?)[^\S\n]*$)'
+)
+
+_SYMPTOM_PATTERNS = {
+    'chest pain': [
+        r'chest\s+(?:pain|discomfort|tightness|pressure)',
+        r'angina',
+        r'chest\s+(?:heaviness|squeezing)'
+    ],
+    'fatigue': [
+        r'(?:feeling\s+)?(?:tired|fatigued|exhausted)',
+        r'low\s+energy',
+        r'lethargy'
+    ],
+    'shortness of breath': [
+        r'(?:short|difficulty)\s+(?:of|with)\s+breath',
+        r'dyspnea',
+        r'breathing\s+(?:difficulty|problem)'
+    ],
+    'hypertension': [
+        r'(?:high|elevated)\s+blood\s+pressure',
+        r'hypertension'
+    ]
+}
+
+# All symptom patterns fused into one alternation; the named group that
+# matched identifies the symptom, so the text is scanned only once
+_SYMPTOM_RE = re.compile('|'.join(
+    f"(?P<{symptom.replace(' ', '_')}>{'|'.join(patterns)})"
+    for symptom, patterns in _SYMPTOM_PATTERNS.items()
+))
+
 class ClinicalGuidelines:
     """Clinical practice guidelines and evidence sources"""
     
@@ -61,48 +109,140 @@ class ClinicalGuidelines:
         ]
     }
 
-@dataclass
+# One case-insensitive alternation per red-flag category
+_RED_FLAG_RES = {
+    category: re.compile('|'.join(map(re.escape, flags)), re.IGNORECASE)
+    for category, flags in ClinicalGuidelines.RED_FLAGS.items()
+}
+
+# Standard patient education and follow-up blocks included in every recommendation set
+_PATIENT_EDUCATION = (
+    {
+        'topic': "Cardiovascular Risk Factors",
+        'resources': ["ACC CardioSmart", "AHA Patient Information"],
+        'key_points': [
+            "Importance of medication adherence",
+            "Lifestyle modifications",
+            "Recognition of warning symptoms"
+        ]
+    },
+    {
+        'topic': "Lifestyle Modifications",
+        'resources': ["DASH Diet", "Physical Activity Guidelines"],
+        'key_points': [
+            "Sodium restriction",
+            "Regular exercise",
+            "Stress management"
+        ]
+    }
+)
+
+_FOLLOW_UP = (
+    {
+        'timing': "1 week",
+        'purpose': "Review diagnostic results",
+        'modality': "In-person"
+    },
+    {
+        'timing': "3 months",
+        'purpose': "Medication adjustment",
+        'modality': "Telehealth if stable"
+    }
+)
+
+# ACC/AHA categories from most to least severe: a reading falls in the first
+# category whose systolic or diastolic minimum it reaches. Elevated depends on
+# systolic alone, since a diastolic of 80 or more is already Stage 1.
+_BP_THRESHOLDS = (
+    (180, 120, "Hypertensive Crisis"),
+    (140, 90, "Stage 2 Hypertension"),
+    (130, 80, "Stage 1 Hypertension"),
+    (120, float('inf'), "Elevated")
+)
+
+def _keyword_index(keywords) -> ahocorasick.Automaton:
+    """Aho-Corasick automaton over lowercase keywords; reports overlapping and nested matches too"""
+    automaton = ahocorasick.Automaton()
+    for rank, keyword in enumerate(keywords):
+        automaton.add_word(keyword, (rank, keyword))
+    automaton.make_automaton()
+    return automaton
+
+def _find_keywords(index: ahocorasick.Automaton, text: str) -> List[str]:
+    """Distinct indexed keywords occurring in lowercase text, in index order"""
+    if index.kind != ahocorasick.AHOCORASICK:
+        return []  # Empty keyword table
+    return [keyword for _, keyword in sorted({match for _, match in index.iter(text)})]
+
+@dataclass(slots=True)
 class VitalSigns:
     blood_pressure: Optional[str] = None
     heart_rate: Optional[str] = None
     temperature: Optional[str] = None
     respiratory_rate: Optional[str] = None
     oxygen_saturation: Optional[str] = None
+    # Parsed BP and its category, valid while blood_pressure equals _bp_source
+    _bp_source: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    _bp_values: Optional[tuple] = field(default=None, init=False, repr=False, compare=False)
+    _bp_category: Optional[str] = field(default=None, init=False, repr=False, compare=False)
 
     @staticmethod
     def parse_bp(bp_str: str) -> tuple:
         """Parse blood pressure string into systolic and diastolic values"""
-        match = re.search(r'(\d+)/(\d+)', bp_str)
+        systolic, sep, diastolic = bp_str.partition('/')
+        if sep and systolic.isdecimal() and diastolic.isdecimal():
+            return int(systolic), int(diastolic)
+        # Fall back to the pattern for readings with units or surrounding text
+        match = _BP_PARSE_RE.search(bp_str)
         if match:
             return int(match.group(1)), int(match.group(2))
         return None, None
 
+    def _parsed_bp(self) -> tuple:
+        """Systolic and diastolic values, parsed once per blood pressure reading"""
+        if self._bp_values is None or self._bp_source != self.blood_pressure:
+            self._bp_source = self.blood_pressure
+            self._bp_values = self.parse_bp(self.blood_pressure) if self.blood_pressure else (None, None)
+            self._bp_category = None
+        return self._bp_values
+
     def is_hypertensive(self) -> bool:
         """Check if blood pressure indicates hypertension"""
-        if self.blood_pressure:
-            systolic, diastolic = self.parse_bp(self.blood_pressure)
-            if systolic and diastolic:
-                return systolic >= 140 or diastolic >= 90
+        systolic, diastolic = self._parsed_bp()
+        if systolic and diastolic:
+            return systolic >= 140 or diastolic >= 90
         return False
     
     def get_bp_category(self) -> str:
         """Categorize blood pressure according to ACC/AHA guidelines"""
-        if self.blood_pressure:
-            systolic, diastolic = self.parse_bp(self.blood_pressure)
-            if systolic and diastolic:
-                if systolic >= 180 or diastolic >= 120:
-                    return "Hypertensive Crisis"
-                elif systolic >= 140 or diastolic >= 90:
-                    return "Stage 2 Hypertension"
-                elif systolic >= 130 or diastolic >= 80:
-                    return "Stage 1 Hypertension"
-                elif systolic >= 120 and systolic < 130 and diastolic < 80:
-                    return "Elevated"
-                else:
-                    return "Normal"
+        systolic, diastolic = self._parsed_bp()
+        if self._bp_category is None:
+            self._bp_category = self._categorize_bp(systolic, diastolic)
+        return self._bp_category
+
+    @staticmethod
+    def classify_bp_batch(systolic: np.ndarray, diastolic: np.ndarray) -> np.ndarray:
+        """Categorize many blood pressure readings at once, like get_bp_category"""
+        systolic = np.asarray(systolic, dtype=float)
+        diastolic = np.asarray(diastolic, dtype=float)
+        unknown = ~(np.isfinite(systolic) & np.isfinite(diastolic)) | (systolic == 0) | (diastolic == 0)
+        conditions = [unknown] + [
+            (systolic >= systolic_min) | (diastolic >= diastolic_min)
+            for systolic_min, diastolic_min, _ in _BP_THRESHOLDS
+        ]
+        choices = ["Unknown"] + [category for _, _, category in _BP_THRESHOLDS]
+        return np.select(conditions, choices, default="Normal")
+
+    @staticmethod
+    def _categorize_bp(systolic: Optional[int], diastolic: Optional[int]) -> str:
+        if systolic and diastolic:
+            for systolic_min, diastolic_min, category in _BP_THRESHOLDS:
+                if systolic >= systolic_min or diastolic >= diastolic_min:
+                    return category
+            return "Normal"
         return "Unknown"
 
-@dataclass
+@dataclass(slots=True)
 class SOAPNote:
     patient_name: str
     age: int
@@ -193,6 +333,24 @@ class SOAPProcessor:
             ]
         }
 
+        # Example drugs as sets for membership tests against the current plan
+        for med_classes in self.medication_classes.values():
+            for med_class in med_classes:
+                med_class['examples_set'] = frozenset(med_class['examples'])
+
+        # Reverse indexes: each condition is scanned once for every known topic
+        # instead of once per guideline source or medication category
+        self._topic_sources = {}
+        for sources in ClinicalGuidelines.GUIDELINE_SOURCES.values():
+            for source in sources:
+                self._topic_sources.setdefault(source['topic'].lower(), []).append(source)
+        self._topic_index = _keyword_index(self._topic_sources)
+        self._med_category_index = _keyword_index(self.medication_classes)
+
+        # Identical notes are common in batch runs; memoize on the note content
+        self._cached_search_queries = lru_cache(maxsize=1024)(self._search_queries)
+        self._cached_recommendations = lru_cache(maxsize=1024)(self._recommendations)
+
     def parse_soap_note(self, text: str) -> SOAPNote:
         """Parse SOAP note text into structured format"""
         sections = self._split_into_sections(text)
@@ -210,7 +368,7 @@ class SOAPProcessor:
         return SOAPNote(
             patient_name=patient_info.get('name', ''),
             age=int(patient_info.get('age', 0)),
-            date=datetime.strptime(patient_info.get('date', ''), '%Y-%m-%d'),
+            date=datetime.fromisoformat(patient_info.get('date') or '1970-01-01'),
             provider=patient_info.get('provider', ''),
             visit_type=patient_info.get('visit_type', ''),
             subjective=sections.get('S', ''),
@@ -222,31 +380,16 @@ class SOAPProcessor:
 
     def _split_into_sections(self, text: str) -> Dict[str, str]:
         """Split SOAP note into sections"""
-        sections = {}
-        current_section = 'header'
-        current_text = []
-        
-        for line in text.split('\n'):
-            if line.strip().startswith('S –'):
-                current_section = 'S'
-                current_text = []
-            elif line.strip().startswith('O –'):
-                sections[current_section] = '\n'.join(current_text)
-                current_section = 'O'
-                current_text = []
-            elif line.strip().startswith('A –'):
-                sections[current_section] = '\n'.join(current_text)
-                current_section = 'A'
-                current_text = []
-            elif line.strip().startswith('P –'):
-                sections[current_section] = '\n'.join(current_text)
-                current_section = 'P'
-                current_text = []
-            else:
-                current_text.append(line.strip())
+        parts = _SECTION_SPLIT_RE.split(text)
         
-        sections[current_section] = '\n'.join(current_text)
-        return sections
+        # parts is [header, key, body, key, body, ...]; every chunk but the last
+        # still ends with the line break in front of the next section marker
+        keys = ['header'] + parts[1::2]
+        chunks = [chunk[:-1] for chunk in parts[:-1:2]] + [parts[-1]]
+        return {
+            key: '\n'.join(line.strip() for line in chunk.split('\n'))
+            for key, chunk in zip(keys, chunks)
+        }
 
     def _extract_patient_info(self, header: str) -> Dict[str, str]:
         """Extract patient information from header"""
@@ -263,23 +406,23 @@ class SOAPProcessor:
         vitals = VitalSigns()
         
         # Extract vital signs using regex
-        bp_match = re.search(r'BP:\s*(\d+/\d+)', objective)
+        bp_match = _BP_RE.search(objective)
         if bp_match:
             vitals.blood_pressure = bp_match.group(1)
             
-        hr_match = re.search(r'HR:\s*(\d+)', objective)
+        hr_match = _HR_RE.search(objective)
         if hr_match:
             vitals.heart_rate = hr_match.group(1)
             
-        temp_match = re.search(r'Temp:\s*([\d.]+)', objective)
+        temp_match = _TEMP_RE.search(objective)
         if temp_match:
             vitals.temperature = temp_match.group(1)
             
-        rr_match = re.search(r'RR:\s*(\d+)', objective)
+        rr_match = _RR_RE.search(objective)
         if rr_match:
             vitals.respiratory_rate = rr_match.group(1)
             
-        spo2_match = re.search(r'SpO₂:\s*(\d+%)', objective)
+        spo2_match = _SPO2_RE.search(objective)
         if spo2_match:
             vitals.oxygen_saturation = spo2_match.group(1)
             
@@ -287,13 +430,7 @@ class SOAPProcessor:
 
     def _parse_assessment(self, assessment: str) -> List[str]:
         """Parse assessment section into list of problems"""
-        problems = []
-        for line in assessment.split('\n'):
-            if '–' in line or '-' in line:
-                continue
-            if line.strip():
-                problems.append(line.strip())
-        return problems
+        return [match.group(1) for match in _ASSESSMENT_RE.finditer(assessment)]
 
     def _parse_plan(self, plan: str) -> Dict[str, List[str]]:
         """Parse plan section into categorized actions"""
@@ -305,73 +442,106 @@ class SOAPProcessor:
         }
         
         current_category = None
-        for line in plan.split('\n'):
-            line = line.strip()
-            if not line:
-                continue
-                
-            if line.endswith(':'):
-                current_category = line[:-1]
-                continue
-                
-            if current_category and line.startswith('-'):
-                categories[current_category].append(line[1:].strip())
+        for match in _PLAN_LINE_RE.finditer(plan):
+            category = match.group('category')
+            if category is not None:
+                current_category = category
+            elif current_category:
+                categories[current_category].append(match.group('item'))
                 
         return categories
 
+    @staticmethod
+    def _note_key(soap_note: SOAPNote) -> tuple:
+        """Hashable view of the note fields that queries and recommendations depend on"""
+        medications = soap_note.plan.get('Medications')
+        return (
+            soap_note.subjective,
+            tuple(soap_note.assessment),
+            soap_note.vital_signs.get_bp_category(),
+            None if medications is None else tuple(medications)
+        )
+
     def generate_search_queries(self, soap_note: SOAPNote) -> List[Dict[str, Any]]:
         """Generate targeted search queries based on SOAP note content"""
+        return list(self._cached_search_queries(*self._note_key(soap_note)))
+
+    def generate_recommendations(self, soap_note: SOAPNote) -> Dict[str, Any]:
+        """Generate comprehensive clinical recommendations based on SOAP note analysis"""
+        cached = self._cached_recommendations(*self._note_key(soap_note))
+        return {key: list(items) for key, items in cached.items()}
+
+    def _search_queries(
+        self,
+        subjective: str,
+        conditions: tuple,
+        bp_category: str,
+        medications: Optional[tuple]
+    ) -> List[Dict[str, Any]]:
+        """Build search queries from the fields picked out by _note_key"""
         queries = []
         
         # Extract symptoms and conditions
-        symptoms = self._extract_symptoms(soap_note.subjective)
-        conditions = soap_note.assessment
-        bp_category = soap_note.vital_signs.get_bp_category()
+        symptoms = self._extract_symptoms(subjective)
+        condition_lowers = [condition.lower() for condition in conditions]
         
         # Generate guideline-specific queries
-        for condition in conditions:
-            for guideline_type, sources in ClinicalGuidelines.GUIDELINE_SOURCES.items():
-                for source in sources:
-                    if any(keyword in condition.lower() for keyword in [source['topic'].lower()]):
-                        queries.append({
-                            'text': f"{source['org']} {source['topic']} guidelines {source['year']} recommendations",
-                            'focus': 'clinical_guidelines',
-                            'priority': 'high'
-                        })
+        queries.extend(
+            {
+                'text': f"{source['org']} {source['topic']} guidelines {source['year']} recommendations",
+                'focus': 'clinical_guidelines',
+                'priority': 'high'
+            }
+            for condition_lower in condition_lowers
+            for topic in _find_keywords(self._topic_index, condition_lower)
+            for source in self._topic_sources[topic]
+        )
 
         # Generate risk assessment queries
-        if any('cardiovascular' in s.lower() for s in symptoms + conditions):
-            for calc in ClinicalGuidelines.RISK_CALCULATORS['cardiovascular']:
-                queries.append({
+        # Symptom names are already lowercase
+        if any('cardiovascular' in s for s in chain(symptoms, condition_lowers)):
+            queries.extend(
+                {
                     'text': f"using {calc} for cardiovascular risk assessment",
                     'focus': 'risk_assessment',
                     'priority': 'medium'
-                })
+                }
+                for calc in ClinicalGuidelines.RISK_CALCULATORS['cardiovascular']
+            )
 
         # Generate medication-specific queries
-        if 'Medications' in soap_note.plan:
-            current_meds = soap_note.plan['Medications']
-            for med in current_meds:
-                queries.append({
-                    'text': f"safety and efficacy of {med} in {bp_category.lower()} with {' and '.join(conditions)}",
+        if medications is not None:
+            context = f"{bp_category.lower()} with {' and '.join(conditions)}"
+            queries.extend(
+                {
+                    'text': f"safety and efficacy of {med} in {context}",
                     'focus': 'medication',
                     'priority': 'high'
-                })
+                }
+                for med in medications
+            )
 
         # Generate diagnostic queries
-        for symptom in symptoms:
-            if symptom in self.common_symptoms:
-                for workup in self.common_symptoms[symptom]['workup']:
-                    queries.append({
-                        'text': f"evidence based approach to {workup} in {symptom}",
-                        'focus': 'diagnostic',
-                        'priority': 'medium'
-                    })
+        queries.extend(
+            {
+                'text': f"evidence based approach to {workup} in {symptom}",
+                'focus': 'diagnostic',
+                'priority': 'medium'
+            }
+            for symptom in symptoms if symptom in self.common_symptoms
+            for workup in self.common_symptoms[symptom]['workup']
+        )
 
         return queries
 
-    def generate_recommendations(self, soap_note: SOAPNote) -> Dict[str, Any]:
-        """Generate comprehensive clinical recommendations based on SOAP note analysis"""
+    def _recommendations(
+        self,
+        subjective: str,
+        assessment: tuple,
+        bp_category: str,
+        medications: Optional[tuple]
+    ) -> Dict[str, Any]:
+        """Build recommendations from the fields picked out by _note_key"""
         recommendations = {
             'urgent_actions': [],
             'risk_assessment': [],
@@ -386,7 +556,6 @@ class SOAPProcessor:
         }
         
         # Check vital signs and generate urgent actions
-        bp_category = soap_note.vital_signs.get_bp_category()
         if bp_category in ["Stage 2 Hypertension", "Hypertensive Crisis"]:
             recommendations['urgent_actions'].append({
                 'action': f"Address {bp_category}",
@@ -396,43 +565,45 @@ class SOAPProcessor:
             })
 
         # Extract symptoms and check for red flags
-        symptoms = self._extract_symptoms(soap_note.subjective)
-        for symptom in symptoms:
-            if symptom == 'chest_pain':
-                for red_flag in ClinicalGuidelines.RED_FLAGS['chest_pain']:
-                    if red_flag.lower() in soap_note.subjective.lower():
-                        recommendations['urgent_actions'].append({
-                            'action': f"Evaluate for acute coronary syndrome",
-                            'rationale': f"Presence of red flag: {red_flag}",
-                            'guideline': "ACC/AHA Chest Pain Guidelines",
-                            'evidence_level': "Class I"
-                        })
+        symptoms = self._extract_symptoms(subjective)
+        if 'chest pain' in symptoms:
+            present = {m.group(0).lower() for m in _RED_FLAG_RES['chest_pain'].finditer(subjective)}
+            for red_flag in ClinicalGuidelines.RED_FLAGS['chest_pain']:
+                if red_flag.lower() in present:
+                    recommendations['urgent_actions'].append({
+                        'action': f"Evaluate for acute coronary syndrome",
+                        'rationale': f"Presence of red flag: {red_flag}",
+                        'guideline': "ACC/AHA Chest Pain Guidelines",
+                        'evidence_level': "Class I"
+                    })
 
         # Generate diagnostic recommendations
-        for symptom in symptoms:
-            if symptom in self.common_symptoms:
-                for workup in self.common_symptoms[symptom]['workup']:
-                    recommendations['diagnostics'].append({
-                        'test': workup,
-                        'rationale': f"Evaluate {symptom}",
-                        'guideline': self.common_symptoms[symptom]['guidelines'][0],
-                        'priority': 'high' if 'ECG' in workup or 'Cardiac' in workup else 'routine'
-                    })
+        recommendations['diagnostics'].extend(
+            {
+                'test': workup,
+                'rationale': f"Evaluate {symptom}",
+                'guideline': self.common_symptoms[symptom]['guidelines'][0],
+                'priority': 'high' if 'ECG' in workup or 'Cardiac' in workup else 'routine'
+            }
+            for symptom in symptoms if symptom in self.common_symptoms
+            for workup in self.common_symptoms[symptom]['workup']
+        )
 
         # Medication recommendations
-        current_meds = soap_note.plan.get('Medications', [])
-        for condition in soap_note.assessment:
-            condition_lower = condition.lower()
-            for med_category, meds in self.medication_classes.items():
-                if med_category in condition_lower:
-                    for med_class in meds:
-                        if not any(current_med in med_class['examples'] for current_med in current_meds):
-                            recommendations['medications'].append({
-                                'action': f"Consider {med_class['class']}",
-                                'rationale': f"Standard therapy for {condition}",
-                                'examples': med_class['examples'],
-                                'guideline': f"Current {condition} Guidelines"
-                            })
+        if assessment and self.medication_classes:
+            current_meds = {med.lower() for med in medications or ()}
+            recommendations['medications'].extend(
+                {
+                    'action': f"Consider {med_class['class']}",
+                    'rationale': f"Standard therapy for {condition}",
+                    'examples': med_class['examples'],
+                    'guideline': f"Current {condition} Guidelines"
+                }
+                for condition in assessment
+                for med_category in _find_keywords(self._med_category_index, condition.lower())
+                for med_class in self.medication_classes[med_category]
+                if current_meds.isdisjoint(med_class['examples_set'])
+            )
 
         # Monitoring recommendations
         if bp_category != "Normal":
@@ -444,76 +615,20 @@ class SOAPProcessor:
                 'guideline': "ACC/AHA Hypertension Guidelines"
             })
 
-        # Patient education
-        recommendations['patient_education'].extend([
-            {
-                'topic': "Cardiovascular Risk Factors",
-                'resources': ["ACC CardioSmart", "AHA Patient Information"],
-                'key_points': [
-                    "Importance of medication adherence",
-                    "Lifestyle modifications",
-                    "Recognition of warning symptoms"
-                ]
-            },
-            {
-                'topic': "Lifestyle Modifications",
-                'resources': ["DASH Diet", "Physical Activity Guidelines"],
-                'key_points': [
-                    "Sodium restriction",
-                    "Regular exercise",
-                    "Stress management"
-                ]
-            }
-        ])
-
-        # Follow-up recommendations
-        recommendations['follow_up'].extend([
-            {
-                'timing': "1 week",
-                'purpose': "Review diagnostic results",
-                'modality': "In-person"
-            },
-            {
-                'timing': "3 months",
-                'purpose': "Medication adjustment",
-                'modality': "Telehealth if stable"
-            }
-        ])
+        # Patient education and follow-up are the same for every note
+        recommendations['patient_education'].extend(_PATIENT_EDUCATION)
+        recommendations['follow_up'].extend(_FOLLOW_UP)
 
         return recommendations
 
     def _extract_symptoms(self, subjective: str) -> List[str]:
         """Extract symptoms from subjective section with enhanced pattern matching"""
-        symptoms = []
-        
-        # Define symptom patterns with variations
-        symptom_patterns = {
-            'chest pain': [
-                r'chest\s+(?:pain|discomfort|tightness|pressure)',
-                r'angina',
-                r'chest\s+(?:heaviness|squeezing)'
-            ],
-            'fatigue': [
-                r'(?:feeling\s+)?(?:tired|fatigued|exhausted)',
-                r'low\s+energy',
-                r'lethargy'
-            ],
-            'shortness of breath': [
-                r'(?:short|difficulty)\s+(?:of|with)\s+breath',
-                r'dyspnea',
-                r'breathing\s+(?:difficulty|problem)'
-            ],
-            'hypertension': [
-                r'(?:high|elevated)\s+blood\s+pressure',
-                r'hypertension'
-            ]
-        }
-        
-        # Check each symptom pattern
-        for symptom, patterns in symptom_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, subjective.lower()):
-                    symptoms.append(symptom)
-                    break  # Found one pattern for this symptom, move to next symptom
+        lowered = subjective.lower()
+        found = set()
+        for match in _SYMPTOM_RE.finditer(lowered):
+            found.add(match.lastgroup)
+            if len(found) == len(_SYMPTOM_PATTERNS):
+                break  # Every symptom seen, the rest of the text can't add any
         
-        return symptoms 
\ No newline at end of file
+        # Report symptoms in pattern order, each at most once
+        return [symptom for symptom in _SYMPTOM_PATTERNS if symptom.replace(' ', '_') in found]
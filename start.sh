@@ -2,7 +2,7 @@
 
 # Start the backend server
 echo "Starting backend server..."
-python3 main.py &
+DEV=1 python3 main.py &
 
 # Navigate to frontend directory and install dependencies
 echo "Setting up frontend..."
@@ -0,0 +1,58 @@
+from fastapi.testclient import TestClient
+
+import main
+import pubmed_search
+from pubmed_search import Article
+
+
+def make_article(pmid: str, publication_types: list) -> Article:
+    return Article(
+        pmid=pmid,
+        title="Statin use and outcomes",
+        abstract="",
+        authors=[],
+        journal="",
+        publication_date="2023",
+        doi=None,
+        mesh_terms=["Cohort Studies"],
+        publication_types=publication_types,
+        keywords=[],
+        affiliations=[],
+        pmc_id=None
+    )
+
+
+def test_search_keeps_articles_matched_by_mesh_mapped_type(monkeypatch):
+    searched = []
+
+    async def cached_query(cache_key):
+        return "statins AND elderly"
+
+    async def search(query, max_results=5, http=None):
+        searched.append(query)
+        return {"count": "1", "idlist": ["1"]}
+
+    async def fetch(search_results, http=None):
+        # Cohort studies carry the MeSH heading, not a matching publication type
+        return [make_article("1", ["Journal Article"])]
+
+    async def summarize(articles, user_query, oai=None):
+        return {"summary": "ok", "citations": []}
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setattr(pubmed_search, "_aget_cached_query", cached_query)
+    monkeypatch.setattr(pubmed_search, "asearch_pubmed", search)
+    monkeypatch.setattr(pubmed_search, "afetch_article_details", fetch)
+    monkeypatch.setattr(pubmed_search, "asummarize_results", summarize)
+
+    with TestClient(main.app) as client:
+        response = client.post("/search", json={
+            "text": "statin outcomes in elderly cohorts",
+            "year_filter": "",
+            "article_types": ["Cohort Study"],
+            "include_medlineplus": False
+        })
+
+    assert response.status_code == 200
+    assert searched == ['statins AND elderly AND ("Cohort Studies"[mh])']
+    assert [article["pmid"] for article in response.json()["pubmed_results"]["articles"]] == ["1"]
@@ -0,0 +1,121 @@
+import asyncio
+import io
+import time
+from types import SimpleNamespace
+
+import httpx
+import openai
+from tenacity import wait_none
+
+import pubmed_search
+
+
+class FlakyCompletions:
+    """
+    Chat completions stub that times out a set number of times, then answers.
+    """
+    def __init__(self, failures: int, content: str):
+        self.failures = failures
+        self.content = content
+        self.calls = 0
+
+    def create(self, **kwargs):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise openai.APITimeoutError(request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions"))
+        message = SimpleNamespace(content=self.content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def test_convert_to_pubmed_query_retries_transient_openai_error(monkeypatch):
+    completions = FlakyCompletions(failures=1, content="(statins) AND (elderly)")
+    openai_stub = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    monkeypatch.setattr(pubmed_search, "_default_openai", lambda: openai_stub)
+    monkeypatch.setattr(pubmed_search, "_get_cached_query", lambda cache_key: None)
+    monkeypatch.setattr(pubmed_search, "_add_cached_query", lambda cache_key, base_query: None)
+
+    convert = pubmed_search.convert_to_pubmed_query.retry_with(wait=wait_none())
+    query = convert("statins in the elderly", year_filter="")
+
+    assert query == "(statins) AND (elderly)"
+    assert completions.calls == 2
+
+
+def test_publication_type_filter_maps_known_types_and_quotes_others():
+    clause = pubmed_search._publication_type_filter(
+        ["Cohort Study", "case-control", "RCT", "Letter", "randomised controlled trial"]
+    )
+    assert clause == (
+        ' AND ("Cohort Studies"[mh] OR "Case-Control Studies"[mh]'
+        ' OR "Randomized Controlled Trial"[pt] OR "Letter"[pt])'
+    )
+
+
+def test_publication_type_filter_ignores_unsafe_types():
+    assert pubmed_search._publication_type_filter(['x" OR cancer[tiab] OR "y', "Letter*"]) == ""
+    # Punctuation around a known type normalizes to its fixed search term
+    assert pubmed_search._publication_type_filter(["(review)"]) == ' AND ("Review"[pt])'
+    assert pubmed_search._publication_type_filter([]) == ""
+
+
+EFETCH_MARKUP_XML = b"""<?xml version="1.0"?>
+<PubmedArticleSet>
+  <PubmedArticle>
+    <MedlineCitation>
+      <PMID>123</PMID>
+      <Article>
+        <Journal><Title>Journal of Infection</Title></Journal>
+        <ArticleTitle><i>E. coli</i> bacteremia in older adults.</ArticleTitle>
+        <Abstract><AbstractText><b>Background:</b> Rising incidence.</AbstractText></Abstract>
+      </Article>
+    </MedlineCitation>
+  </PubmedArticle>
+</PubmedArticleSet>"""
+
+
+def test_markup_leading_title_and_abstract_are_kept_and_chunked():
+    articles = pubmed_search._parse_articles(io.BytesIO(EFETCH_MARKUP_XML))
+
+    assert articles[0].title == "E. coli bacteremia in older adults."
+    assert articles[0].abstract == "Background: Rising incidence."
+    chunks = pubmed_search.chunk_abstracts(articles)
+    assert chunks == ["[1] Title: E. coli bacteremia in older adults.\nAbstract: Background: Rising incidence.\n\n"]
+
+
+def test_query_cache_falls_back_to_memory_when_disk_cache_cannot_open(monkeypatch, tmp_path):
+    blocker = tmp_path / "not-a-directory"
+    blocker.write_text("")
+    monkeypatch.setattr(pubmed_search, "QUERY_DISK_CACHE_DIR", str(blocker / "query_cache"))
+    monkeypatch.setattr(pubmed_search, "_query_disk_cache", None)
+
+    pubmed_search._add_cached_query("key", "(statins) AND (elderly)")
+
+    assert pubmed_search._get_query_disk_cache() is None
+    assert pubmed_search._get_cached_query("key") == "(statins) AND (elderly)"
+
+
+def test_query_cache_round_trips_through_disk(monkeypatch, tmp_path):
+    monkeypatch.setattr(pubmed_search, "QUERY_DISK_CACHE_DIR", str(tmp_path / "query_cache"))
+    monkeypatch.setattr(pubmed_search, "_query_disk_cache", None)
+
+    pubmed_search._add_cached_query("disk-key", "(statins) AND (elderly)")
+    pubmed_search._query_cache.pop("disk-key")
+
+    assert pubmed_search._get_query_disk_cache() is not None
+    assert pubmed_search._get_cached_query("disk-key") == "(statins) AND (elderly)"
+    pubmed_search._get_query_disk_cache().close()
+
+
+def test_eutils_rate_limiter_spaces_sync_and_async_requests():
+    limiter = pubmed_search.EutilsRateLimiter(requests_per_second=50)
+
+    async def burst():
+        await asyncio.gather(*(limiter.await_slot() for _ in range(4)))
+
+    start = time.monotonic()
+    asyncio.run(burst())
+    limiter.wait()
+    limiter.wait()
+
+    # Six requests at 50/s: the last one may start no earlier than 5 intervals in
+    assert time.monotonic() - start >= 5 * 0.02 - 0.005